@@ -56,6 +56,11 @@ class RiskManager:
     def reload_settings(self):
         self._load_or_default()
 
+    def reconfigure(self, sm):
+        """Bind ulang ke SettingsManager lain (reuse instance antar run backtest)."""
+        self.sm = sm
+        self._load_or_default()
+
     @staticmethod
     def _get_point(symbol_info: dict) -> float:
         p = float(symbol_info.get('point', 0.0))
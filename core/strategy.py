@@ -21,6 +21,14 @@ except Exception:
 class TradingStrategy:
 
     def __init__(self, sm: SettingsManager):
+        self._indicator_params = None
+        self.reconfigure(sm)
+
+    def reconfigure(self, sm: SettingsManager):
+        """
+        Bind ulang ke settings baru tanpa membuat instance baru (dipakai ulang antar run backtest).
+        Objek indikator hanya dibangun ulang jika parameternya berubah.
+        """
         self.sm = sm
         self.settings = sm.load_settings()
 
@@ -40,35 +48,15 @@ class TradingStrategy:
         self.log_mtf = self.debug_config.get('log_mtf_filter', False)
         self.log_regime = self.debug_config.get('log_regime_changes', False)
 
-        self.ma = MovingAverage(period=ind['ma_period'], shift=ind['ma_shift'])
-        self.ma_long = MovingAverage(period=ind['ma_long_period'], shift=ind['ma_shift']) 
-        # EMA 200 untuk Trend Filter Global
-        self.ema_trend = MovingAverage(period=200)
-
-        self.rsi = RSI(period=ind['rsi_period'],
-                            overbought=ind['rsi_overbought'], oversold=ind['rsi_oversold'])
-        self.macd = MACD(fast_period=ind['macd_fast'],
-                            slow_period=ind['macd_slow'], signal_period=ind['macd_signal'])
-        self.bb = BollingerBands(period=ind['bb_period'], deviation=ind['bb_deviation'])
-        self.atr = ATR(period=ind['atr_period'])
-        self.stoch = Stochastic(
-            k_period=ind['stoch_k_period'],
-            d_period=ind['stoch_d_period'],
-            slowing=ind['stoch_slowing'],
-            overbought=ind['stoch_overbought'],
-            oversold=ind['stoch_oversold'],
-        )
-        
-        # Configurable Lookback for Fibonacci
         fib_lookback = int(sig.get('fib_lookback', 100))
-        self.fib = FibonacciRetracement(lookback=fib_lookback)
-        
-        self.cp = CandlePattern() 
-        
+        indicator_params = (dict(ind), fib_lookback)
+        if indicator_params != self._indicator_params:
+            self._build_indicators(ind, fib_lookback)
+            self._indicator_params = indicator_params
+
         # Default MTF config akan disesuaikan lagi oleh style profile
         self.htf_timeframe = sig.get('higher_timeframe', 'H1') 
         self.enable_mtf = sig.get('enable_mtf', True)
-        self.ma_htf = MovingAverage(period=50) 
 
         self.signal_config = sig
         self.scoring_config = sig.get('scoring', {})
@@ -100,6 +88,31 @@ class TradingStrategy:
             except Exception:
                 self.ai_analyzer = None
 
+    def _build_indicators(self, ind: dict, fib_lookback: int):
+        self.ma = MovingAverage(period=ind['ma_period'], shift=ind['ma_shift'])
+        self.ma_long = MovingAverage(period=ind['ma_long_period'], shift=ind['ma_shift']) 
+        # EMA 200 untuk Trend Filter Global
+        self.ema_trend = MovingAverage(period=200)
+
+        self.rsi = RSI(period=ind['rsi_period'],
+                            overbought=ind['rsi_overbought'], oversold=ind['rsi_oversold'])
+        self.macd = MACD(fast_period=ind['macd_fast'],
+                            slow_period=ind['macd_slow'], signal_period=ind['macd_signal'])
+        self.bb = BollingerBands(period=ind['bb_period'], deviation=ind['bb_deviation'])
+        self.atr = ATR(period=ind['atr_period'])
+        self.stoch = Stochastic(
+            k_period=ind['stoch_k_period'],
+            d_period=ind['stoch_d_period'],
+            slowing=ind['stoch_slowing'],
+            overbought=ind['stoch_overbought'],
+            oversold=ind['stoch_oversold'],
+        )
+        
+        self.fib = FibonacciRetracement(lookback=fib_lookback)
+        
+        self.cp = CandlePattern() 
+        self.ma_htf = MovingAverage(period=50) 
+
     def _apply_style_profile(self, style: str):
         """
         Sesuaikan parameter strategi berdasarkan trading_style:
@@ -312,6 +325,19 @@ class TradingStrategy:
         }
         return signal_type, confidence, details
 
+    def precompute(self, df: pd.DataFrame) -> dict:
+        """
+        Hitung fitur indikator sekali untuk seluruh data (dipakai backtester).
+        feats[key][j] = nilai indikator pada bar j, NaN jika data belum cukup.
+        """
+        n = len(df)
+        atr = np.full(n, np.nan)
+        atr_series = self.atr._calculate_atr_series(df)
+        if not atr_series.empty:
+            atr[:] = atr_series.to_numpy(dtype=float)
+            atr[:self.atr.period] = np.nan
+        return {'atr': atr}
+
     def _get_htf_trend(self, df_htf: pd.DataFrame) -> str:
         """Get trend dari Higher Time Frame"""
         if df_htf is None or len(df_htf) < 50:
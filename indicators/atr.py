@@ -25,21 +25,19 @@ class ATR:
         if current_hash == self._last_hash and self._atr_series_cache is not None:
             return self._atr_series_cache
         
-        # --- Optimized Calculation (Tanpa df.copy full) ---
-        high = df['high']
-        low = df['low']
-        close_prev = df['close'].shift(1)
+        # --- Optimized Calculation (ndarray, tanpa DataFrame perantara) ---
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        close = df['close'].to_numpy(dtype=np.float64)
+        close_prev = np.empty_like(close)
+        close_prev[0] = np.nan
+        close_prev[1:] = close[:-1]
         
-        # Hitung TR menggunakan Vectorized Operations (Lebih cepat dari apply/copy)
-        tr1 = high - low
-        tr2 = (high - close_prev).abs()
-        tr3 = (low - close_prev).abs()
-        
-        # Ambil max dari 3 komponen TR
-        true_range = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        # Ambil max dari 3 komponen TR; fmax mengabaikan NaN (bar pertama = high - low)
+        true_range = np.fmax.reduce([high - low, np.abs(high - close_prev), np.abs(low - close_prev)])
         
         # Calculate ATR using EMA (Wilder's Smoothing approximation)
-        atr_series = true_range.ewm(span=self.period, adjust=False).mean()
+        atr_series = pd.Series(true_range, index=df.index).ewm(span=self.period, adjust=False).mean()
         
         # Update Cache
         self._atr_series_cache = atr_series
@@ -287,29 +287,32 @@ def trading_style_menu(sm: SettingsManager):
 
 def profit_target_menu(sm: SettingsManager):
     ptm = ProfitTargetManager(sm)
-    while True:
-        clear_screen()
-        ptm.load_settings()
-        ptm.load_daily_stats()
-        print_box_separator(WIDTH, 'top')
-        print_box_line(f"{C_HEADER}PROFIT TARGET", width=WIDTH)
-        print_box_separator(WIDTH, 'middle')
-        print_box_line(f"Status: {'ON' if ptm.enabled else 'OFF'}", width=WIDTH)
-        print_box_line(f"Target: ${ptm.daily_target_usd}", f"Current: ${ptm.today_profit:.2f}", width=WIDTH)
-        print_box_separator(WIDTH, 'middle')
-        print_box_line("[1] Toggle ON/OFF", width=WIDTH)
-        print_box_line("[2] Set Target", width=WIDTH)
-        print_box_line("[3] Reset Stats", width=WIDTH)
-        print_box_line("[0] Back", width=WIDTH)
-        print_box_separator(WIDTH, 'bottom')
-        
-        ch = input(C_YELLOW + "\nChoice: ").strip()
-        if ch == '0': break
-        elif ch == '1': ptm.toggle_enabled()
-        elif ch == '2': 
-            t = input("New Target ($): ").strip()
-            ptm.update_target(t)
-        elif ch == '3': ptm.manual_reset()
+    try:
+        while True:
+            clear_screen()
+            ptm.load_settings()
+            ptm.load_daily_stats()
+            print_box_separator(WIDTH, 'top')
+            print_box_line(f"{C_HEADER}PROFIT TARGET", width=WIDTH)
+            print_box_separator(WIDTH, 'middle')
+            print_box_line(f"Status: {'ON' if ptm.enabled else 'OFF'}", width=WIDTH)
+            print_box_line(f"Target: ${ptm.daily_target_usd}", f"Current: ${ptm.today_profit:.2f}", width=WIDTH)
+            print_box_separator(WIDTH, 'middle')
+            print_box_line("[1] Toggle ON/OFF", width=WIDTH)
+            print_box_line("[2] Set Target", width=WIDTH)
+            print_box_line("[3] Reset Stats", width=WIDTH)
+            print_box_line("[0] Back", width=WIDTH)
+            print_box_separator(WIDTH, 'bottom')
+        
+            ch = input(C_YELLOW + "\nChoice: ").strip()
+            if ch == '0': break
+            elif ch == '1': ptm.toggle_enabled()
+            elif ch == '2': 
+                t = input("New Target ($): ").strip()
+                ptm.update_target(t)
+            elif ch == '3': ptm.manual_reset()
+    finally:
+        ptm.close()
 
 def trading_style_menu(sm: SettingsManager):
     while True:
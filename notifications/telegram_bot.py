@@ -1,4 +1,5 @@
 import os
+import heapq
 import requests
 import telebot
 from telebot import types
@@ -878,12 +879,12 @@ Total P/L: `${total_pl:+.2f}`
 • Sharpe Ratio: `{summary.get('sharpe_ratio', 0):.2f}`
 """
             
-            sessions = summary.get('sessions', {})
+            sessions = summary.get('sessions')
             if sessions:
-                message += "\n*Session Breakdown:*\n"
-                for session, pnl in sessions.items():
-                    emoji = "✅" if pnl > 0 else "❌" if pnl < 0 else "⚪"
-                    message += f"• {session}: {emoji} `${pnl:+.2f}`\n"
+                message += "\n*Session Breakdown:*\n" + "".join(
+                    f"• {session}: {'✅' if pnl > 0 else '❌' if pnl < 0 else '⚪'} `${pnl:+.2f}`\n"
+                    for session, pnl in sessions.items()
+                )
             
             message += f"\n📅 {datetime.now().strftime('%Y-%m-%d')}"
             
@@ -1007,6 +1008,9 @@ Total P/L: `${total_pl:+.2f}`
     def notify_strategy_performance(self, strategy_stats: Dict):
         """📊 Per-strategy performance breakdown"""
         try:
+            if not strategy_stats:
+                return
+            
             message = f"""
 📊 *STRATEGY PERFORMANCE*
 ━━━━━━━━━━━━━━━━━━━
@@ -1127,7 +1131,9 @@ No open positions
 *Positions:*
 """
             
-            for pos in positions[:5]:  # Limit to 5 positions
+            # Show the 5 positions with the largest absolute P/L
+            top_positions = heapq.nlargest(5, positions, key=lambda p: abs(p.get('profit', 0.0)))
+            for pos in top_positions:
                 ticket = pos.get('ticket', 'N/A')
                 symbol = pos.get('symbol', 'N/A')
                 type_str = pos.get('type', 'N/A')
@@ -0,0 +1,150 @@
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    # Tanpa numba kernel ini tidak dipakai (MarketRegimeDetector kembali ke jalur pandas/NumPy)
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+
+@njit(cache=True)
+def _ewm_update(w, old_wt, x, alpha):
+    """
+    Satu langkah EWM adjust=False, ignore_na=False seperti pandas: input NaN tidak mengubah
+    nilai tapi bobot lama tetap meluruh. Return (w, old_wt); state awal (nan, 1.0).
+    """
+    if w != w:
+        if x != x:
+            return w, old_wt
+        return x, 1.0
+    old_wt *= 1.0 - alpha
+    if x != x:
+        return w, old_wt
+    if w != x:
+        w = (old_wt * w + alpha * x) / (old_wt + alpha)
+    return w, 1.0
+
+
+@njit(cache=True)
+def _rolling_mean(x, window):
+    n = len(x)
+    out = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        s = 0.0
+        ok = True
+        for j in range(i - window + 1, i + 1):
+            v = x[j]
+            if v != v:
+                ok = False
+                break
+            s += v
+        if ok:
+            out[i] = s / window
+    return out
+
+
+@njit(cache=True)
+def _rolling_std(x, window):
+    """Rolling std (ddof=1) dua-pass per window, cukup untuk window kecil (BB 20)."""
+    n = len(x)
+    out = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        s = 0.0
+        ok = True
+        for j in range(i - window + 1, i + 1):
+            v = x[j]
+            if v != v:
+                ok = False
+                break
+            s += v
+        if not ok:
+            continue
+        mean = s / window
+        ss = 0.0
+        for j in range(i - window + 1, i + 1):
+            d = x[j] - mean
+            ss += d * d
+        out[i] = np.sqrt(ss / (window - 1))
+    return out
+
+
+@njit(cache=True, error_model='numpy')
+def compute_regime_indicators(high, low, close, open_, period_adx=14, period_atr=14, period_bb=20):
+    """
+    Semua indikator regime dalam satu pass: TR, +DM/-DM, EWM DI/DX/ADX, ATR, body candle,
+    lalu rolling BB/body/BBW/ATR.
+    Return (adx, atr, bb_width, bb_mean, bb_std, avg_body, avg_bbw, avg_atr), semua panjang len(close).
+    """
+    n = len(close)
+    alpha_adx = 1.0 / (1.0 + (period_adx - 1) / 2.0)
+    alpha_atr = 1.0 / (1.0 + (period_atr - 1) / 2.0)
+
+    adx = np.empty(n)
+    atr = np.empty(n)
+    body = np.empty(n)
+
+    tr_w = np.nan
+    pdm_w = np.nan
+    mdm_w = np.nan
+    dx_w = np.nan
+    atr_w = np.nan
+    tr_wt = 1.0
+    pdm_wt = 1.0
+    mdm_wt = 1.0
+    dx_wt = 1.0
+    atr_wt = 1.0
+
+    for i in range(n):
+        h = high[i]
+        l = low[i]
+        c = close[i]
+
+        tr = h - l
+        up = np.nan
+        down = np.nan
+        if i > 0:
+            pc = close[i - 1]
+            v = abs(h - pc)
+            if v > tr or tr != tr:
+                tr = v
+            v = abs(l - pc)
+            if v > tr or tr != tr:
+                tr = v
+            up = h - high[i - 1]
+            down = low[i - 1] - l
+
+        pdm = up if (up > down and up > 0) else 0.0
+        mdm = down if (down > up and down > 0) else 0.0
+
+        tr_w, tr_wt = _ewm_update(tr_w, tr_wt, tr, alpha_adx)
+        pdm_w, pdm_wt = _ewm_update(pdm_w, pdm_wt, pdm, alpha_adx)
+        mdm_w, mdm_wt = _ewm_update(mdm_w, mdm_wt, mdm, alpha_adx)
+
+        plus_di = 100 * (pdm_w / tr_w)
+        minus_di = 100 * (mdm_w / tr_w)
+        di_sum = plus_di + minus_di
+        if di_sum == 0:
+            di_sum = 1.0
+        dx = 100 * abs(plus_di - minus_di) / di_sum
+        dx_w, dx_wt = _ewm_update(dx_w, dx_wt, dx, alpha_adx)
+        adx[i] = 0.0 if dx_w != dx_w else dx_w
+
+        atr_w, atr_wt = _ewm_update(atr_w, atr_wt, tr, alpha_atr)
+        atr[i] = 0.0 if atr_w != atr_w else atr_w
+
+        body[i] = abs(c - open_[i])
+
+    bb_mean = _rolling_mean(close, period_bb)
+    bb_std = _rolling_std(close, period_bb)
+    bb_width = np.where(np.isnan(bb_std), 0.0, 4 * bb_std)
+
+    avg_body = _rolling_mean(body, 10)
+    avg_bbw = _rolling_mean(bb_width, 10)
+    avg_atr = _rolling_mean(atr, 20)
+    return adx, atr, bb_width, bb_mean, bb_std, avg_body, avg_bbw, avg_atr
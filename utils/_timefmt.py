@@ -0,0 +1,12 @@
+import time
+
+# Cache timestamp terformat per detik: (epoch int, string)
+_ts_cache = [0, '']
+
+
+def now_str() -> str:
+    """Timestamp lokal 'YYYY-mm-dd HH:MM:SS', diformat ulang hanya saat detik berganti."""
+    t = int(time.time())
+    if t != _ts_cache[0]:
+        _ts_cache[:] = [t, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t))]
+    return _ts_cache[1]
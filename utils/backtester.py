@@ -1,18 +1,136 @@
+import copy
 import json
 from datetime import datetime
+import numpy as np
 import pandas as pd
 import pytz
 import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, Any, List, Tuple
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba opsional: tanpa numba kernel tetap jalan sebagai NumPy biasa
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
 from core.strategy import TradingStrategy
 from core.risk_manager import RiskManager
 from core.mt5_connector import MT5Connector
-from utils.market_regime import MarketRegimeDetector
+from utils.market_regime import MarketRegimeDetector, REGIME_NAMES, REGIME_CODES
 from utils.settings_manager import SettingsManager
 
+SIDE_BUY = 1
+SIDE_SELL = -1
+# Signal strategy yang boleh membuka posisi ('NEUTRAL' dsb. diabaikan)
+_SIDES = {'BUY': SIDE_BUY, 'SELL': SIDE_SELL}
+
+# reason_code dari check_sl_tp -> label close
+_HIT_REASONS = {1: "SL Hit", 2: "TP Hit"}
+_NS_PER_DAY = 86_400_000_000_000
+_OHLC_COLS = ('open', 'high', 'low', 'close')
+_STATS_REGIME_CODES = tuple(REGIME_CODES[r] for r in ('TRENDING', 'RANGING', 'VOLATILE', 'BREAKOUT', 'UNKNOWN'))
+
+# Template teks report backtest (diisi via format_map di _format_report_text)
+_REPORT_TEMPLATE = "\n".join([
+    "=" * 60,
+    "              BACKTEST RESULTS SUMMARY".center(60),
+    "=" * 60,
+    " Symbol: {symbol}",
+    " Timeframe: {timeframe}",
+    " Period: {start_date} to {end_date}",
+    " Strategy: AUTO",
+    "",
+    " PERFORMANCE METRICS:",
+    "-" * 60,
+    " Initial Balance:    ${initial_balance:,.2f}",
+    " Final Balance:      ${final_balance:,.2f}",
+    " Total P/L:          {pnl_sign}${total_pnl:,.2f} ({pnl_sign}{total_pnl_pct:.2f}%)",
+    "",
+    " TRADE STATISTICS:",
+    "-" * 60,
+    " Total Trades:       {total_trades}",
+    " Winners:            {winners} ({win_rate:.1f}%)",
+    " Losers:             {losers} ({loss_rate:.1f}%)",
+    "",
+    " Win Rate:           {win_rate:.1f}%",
+    " Profit Factor:      {profit_factor:.2f}",
+    "",
+    " Average Win:        +${avg_win:.2f}",
+    " Average Loss:       ${avg_loss:.2f}",
+    " Risk/Reward Ratio:  {risk_reward:.2f}",
+    "",
+    " Best Trade:         +${best_trade:.2f}",
+    " Worst Trade:        ${worst_trade:.2f}",
+    "",
+    " DRAWDOWN ANALYSIS:",
+    "-" * 60,
+    " Max Drawdown:       -${max_drawdown:.2f} (-{max_dd_pct:.1f}%)",
+    " Max DD Duration:    {dd_duration} bars",
+    "",
+    " CONSISTENCY:",
+    "-" * 60,
+    " Best Day:           +${best_day:.2f}",
+    " Worst Day:          ${worst_day:.2f}",
+    " Avg Daily P/L:      ${avg_daily_pnl:+.2f}",
+    "",
+    " Green Days:         {green_days} / {total_days} ({green_pct:.1f}%)",
+    " Red Days:           {red_days} / {total_days} ({red_pct:.1f}%)",
+    "",
+])
+_REPORT_FOOTER = "\n".join([
+    "=" * 60,
+    "               END OF REPORT".center(60),
+    "=" * 60,
+])
+
+
+@njit(cache=True)
+def check_sl_tp(sides, sls, tps, open_idx, low, high, cur_idx):
+    """
+    Cek SL/TP semua posisi terbuka terhadap satu bar sekaligus.
+    Return (hit_mask, hit_price, reason_code) dengan reason_code 1=SL, 2=TP.
+    SL dicek duluan, sama seperti urutan cek per-posisi sebelumnya.
+    """
+    active = open_idx != cur_idx
+    is_buy = sides == SIDE_BUY
+    sl_hit = np.where(is_buy, low <= sls, high >= sls) & active
+    tp_hit = np.where(is_buy, high >= tps, low <= tps) & active & ~sl_hit
+    hit_price = np.where(sl_hit, sls, tps)
+    reason_code = sl_hit.astype(np.int8) + 2 * tp_hit.astype(np.int8)
+    return sl_hit | tp_hit, hit_price, reason_code
+
+
+@njit(cache=True)
+def settle_bar(sides, entries, volumes, sls, tps, open_idx, low, high, cur_idx, contract_size):
+    """
+    Settlement satu bar: cek SL/TP + hitung profit posisi yang kena.
+    Return (hit_mask, hit_price, reason_code, profit); profit hanya valid di slot hit_mask.
+    """
+    hit_mask, hit_price, reason_code = check_sl_tp(sides, sls, tps, open_idx, low, high, cur_idx)
+    profit = (hit_price - entries) * sides * contract_size * volumes
+    return hit_mask, hit_price, reason_code, profit
+
+
 class Backtester:
     
+    # Kolom struct-of-arrays untuk posisi terbuka
+    _POS_FIELDS = (
+        ('_pos_ticket', np.int64),
+        ('_pos_type', np.int8),        # SIDE_BUY / SIDE_SELL
+        ('_pos_volume', np.float64),
+        ('_pos_open', np.float64),
+        ('_pos_sl', np.float64),
+        ('_pos_tp', np.float64),
+        ('_pos_risk', np.float64),
+        ('_pos_open_idx', np.int64),   # posisi bar saat open
+        ('_pos_regime', np.int8),      # kode REGIME_CODES
+        ('_pos_alive', np.bool_),
+    )
+    
     def __init__(self, mt5_connector: MT5Connector, sm: SettingsManager):
         print("Initializing Enhanced Backtester...")
         self.mt5 = mt5_connector
@@ -24,45 +142,66 @@ class Backtester:
         self.symbol = self.trading_config['symbol']
         self.timeframe = self.trading_config['timeframe']
         self.min_bars_needed = 200
+        # Jumlah bar history (ekor) yang dikirim ke regime/strategy per bar.
+        # Cukup panjang supaya EMA200 & indikator lain sudah konvergen.
+        self.history_window = int(self.bt_config.get('history_window', 1000))
+        # Opsional: simpan OHLC sebagai float32 (hemat memory, hasil bisa beda tipis di level harga)
+        self.downcast_ohlc = bool(self.bt_config.get('downcast_ohlc', False))
         
         self.regime_detector = MarketRegimeDetector(self.base_sm, symbol=self.symbol)
         
         self.strategy: TradingStrategy = None
         self.risk_manager: RiskManager = None
         self.settings: dict = None
+        # Cache settings hasil merge per custom_settings (parameter sweep memanggil run() berkali-kali)
+        self._settings_memo: Dict[str, dict] = {}
         
         self.balance = 0.0
         self.equity = 0.0
-        self.open_positions = []
+        self._reset_positions()
+        self._index = None
+        self._index_ns = None
+        self._tick_fn = None
         self.closed_trades = []
         self.ticket_counter = 1
         self.symbol_info = None
         self.trade_log_buffer = []
         
-        self.equity_curve = []
-        self.daily_pnl = {}
-        self.regime_stats = {}
+        self._reset_equity_curve(0.0)
+        self._reset_daily_pnl()
+        self._reset_regime_stats()
         
         self.start_date = None
         self.end_date = None
 
     def _apply_custom_settings(self, custom_settings: Dict = None):
-        run_sm = SettingsManager(self.base_sm.settings_path)
+        memo_key = json.dumps(custom_settings, sort_keys=True, default=str) if custom_settings else ''
+        run_settings = self._settings_memo.get(memo_key)
         
-        run_settings = json.loads(json.dumps(self.base_settings))
-        
-        if custom_settings:
-            if 'risk_management' in custom_settings:
-                run_settings['risk_management'].update(custom_settings['risk_management'])
-            if 'signal_requirements' in custom_settings:
-                run_settings['signal_requirements'].update(custom_settings['signal_requirements'])
-            if 'trading' in custom_settings:
-                run_settings['trading'].update(custom_settings['trading'])
+        if run_settings is None:
+            run_settings = copy.deepcopy(self.base_settings)
+            
+            if custom_settings:
+                if 'risk_management' in custom_settings:
+                    run_settings['risk_management'].update(custom_settings['risk_management'])
+                if 'signal_requirements' in custom_settings:
+                    run_settings['signal_requirements'].update(custom_settings['signal_requirements'])
+                if 'trading' in custom_settings:
+                    run_settings['trading'].update(custom_settings['trading'])
+            
+            self._settings_memo[memo_key] = run_settings
 
-        run_sm.settings = run_settings 
+        run_sm = self.base_sm.overlay(run_settings)
         
-        self.risk_manager = RiskManager(run_sm)
-        self.strategy = TradingStrategy(run_sm)
+        # Reuse instance antar run (sweep): cukup bind ulang ke settings run ini
+        if self.risk_manager is None:
+            self.risk_manager = RiskManager(run_sm)
+        else:
+            self.risk_manager.reconfigure(run_sm)
+        if self.strategy is None:
+            self.strategy = TradingStrategy(run_sm)
+        else:
+            self.strategy.reconfigure(run_sm)
         
         self.settings = run_settings
         
@@ -73,212 +212,314 @@ class Backtester:
         self.initial_balance = float(self.bt_config['initial_balance'])
         self.balance = self.initial_balance
         self.equity = self.initial_balance
-        self.open_positions = []
+        self._reset_positions()
         self.closed_trades = []
         self.ticket_counter = 1
         self.symbol_info = None
         self.trade_log_buffer = []
         
-        self.equity_curve = [(None, self.initial_balance)]
-        self.daily_pnl = {}
-        self.regime_stats = {
-            'TRENDING': {'trades': 0, 'wins': 0, 'pnl': 0.0},
-            'RANGING': {'trades': 0, 'wins': 0, 'pnl': 0.0},
-            'VOLATILE': {'trades': 0, 'wins': 0, 'pnl': 0.0},
-            'BREAKOUT': {'trades': 0, 'wins': 0, 'pnl': 0.0},
-            'UNKNOWN': {'trades': 0, 'wins': 0, 'pnl': 0.0}
-        }
+        self._reset_equity_curve(self.initial_balance)
+        self._reset_daily_pnl()
+        self._reset_regime_stats()
         self.current_regime = 'UNKNOWN'
 
-    def _get_mock_symbol_info(self, current_bar):
-        spread_points = self.settings.get('filters', {}).get('spread_settings', {}).get('default_max', 30)
-        
-        if self.symbol_info is None:
-             self.symbol_info = self.mt5.get_symbol_info(self.symbol)
-             if self.symbol_info is None:
-                 raise ValueError(f"Tidak bisa get_symbol_info untuk {self.symbol}")
-        
-        self.symbol_info['bid'] = current_bar['close']
-        self.symbol_info['ask'] = current_bar['close'] + (self.symbol_info['point'] * spread_points)
-        self.symbol_info['spread'] = spread_points
-        return self.symbol_info
+    def _cache_symbol_constants(self):
+        """Simpan field symbol_info yang konstan selama backtest sebagai scalar."""
+        self._spread_points = self.settings.get('filters', {}).get('spread_settings', {}).get('default_max', 30)
+        self._point = float(self.symbol_info['point'])
+        self._contract_size = float(self.symbol_info['trade_contract_size'])
+        self.symbol_info['spread'] = self._spread_points
+
+    def _reset_equity_curve(self, initial_balance: float, capacity: int = 1024):
+        """Buffer equity curve: timestamp (int ns, NaT untuk titik awal) + balance."""
+        self._eq_ts = np.empty(capacity, dtype=np.int64)
+        self._eq_bal = np.empty(capacity, dtype=np.float64)
+        self._eq_ts[0] = np.iinfo(np.int64).min
+        self._eq_bal[0] = initial_balance
+        self._eq_n = 1
+
+    def _record_equity(self, ts_ns: int):
+        n = self._eq_n
+        if n == len(self._eq_bal):
+            self._eq_ts = np.resize(self._eq_ts, n * 2)
+            self._eq_bal = np.resize(self._eq_bal, n * 2)
+        self._eq_ts[n] = ts_ns
+        self._eq_bal[n] = self.balance
+        self._eq_n = n + 1
+
+    def _reset_daily_pnl(self, day0_ns: int = 0, ndays: int = 0):
+        """P/L harian sebagai array per hari sejak day0 (+ jumlah close per hari untuk hitung hari aktif)."""
+        self._day0_ns = day0_ns
+        self._daily = np.zeros(ndays, dtype=np.float64)
+        self._daily_trades = np.zeros(ndays, dtype=np.int64)
+
+    def _reset_regime_stats(self):
+        """Statistik per regime: baris = kode REGIME_CODES, kolom = (trades, wins, pnl)."""
+        self._regime_stats = np.zeros((len(REGIME_NAMES), 3), dtype=np.float64)
+
+    @property
+    def regime_stats(self) -> Dict[str, Dict]:
+        """Statistik per regime sebagai dict (NEUTRAL tidak dilacak, sama seperti sebelumnya)."""
+        return {
+            REGIME_NAMES[code]: {
+                'trades': int(self._regime_stats[code, 0]),
+                'wins': int(self._regime_stats[code, 1]),
+                'pnl': float(self._regime_stats[code, 2]),
+            }
+            for code in _STATS_REGIME_CODES
+        }
+
+    @property
+    def daily_pnl(self) -> Dict:
+        """P/L per tanggal (hanya hari yang ada close trade)."""
+        days = np.flatnonzero(self._daily_trades)
+        return {
+            pd.Timestamp(self._day0_ns + int(d) * _NS_PER_DAY).date(): float(self._daily[d])
+            for d in days
+        }
 
-    def _open_position(self, signal_type, lot_size, price, sl, tp, risk_amount, bar):
-        pos = {
-            'ticket': self.ticket_counter,
+    @property
+    def equity_curve(self) -> pd.Series:
+        """Equity curve sebagai Series balance (index waktu close; NaT untuk titik awal)."""
+        n = self._eq_n
+        return pd.Series(self._eq_bal[:n], index=pd.DatetimeIndex(self._eq_ts[:n].view('datetime64[ns]')))
+
+    def _reset_positions(self, capacity: int = 16):
+        """Struct-of-arrays posisi terbuka. Slot [0:_pos_n] terpakai, yang closed ditandai _pos_alive=False."""
+        for name, dtype in self._POS_FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self._pos_n = 0
+        self._pos_dead = 0
+
+    def _grow_positions(self):
+        for name, _ in self._POS_FIELDS:
+            arr = getattr(self, name)
+            grown = np.zeros(len(arr) * 2, dtype=arr.dtype)
+            grown[:self._pos_n] = arr[:self._pos_n]
+            setattr(self, name, grown)
+
+    def _compact_positions(self):
+        """Buang slot posisi yang sudah closed (urutan open tetap terjaga)."""
+        n = self._pos_n
+        keep = np.flatnonzero(self._pos_alive[:n])
+        m = len(keep)
+        for name, _ in self._POS_FIELDS:
+            arr = getattr(self, name)
+            arr[:m] = arr[keep]
+        self._pos_alive[m:n] = False
+        self._pos_n = m
+        self._pos_dead = 0
+
+    def _position_view(self, k: int) -> Dict:
+        """View dict satu posisi, format sama dengan posisi live (untuk strategy/risk manager)."""
+        return {
+            'ticket': int(self._pos_ticket[k]),
             'symbol': self.symbol,
-            'type': signal_type,
-            'volume': lot_size,      
-            'price_open': price,      
-            'sl': sl,
-            'tp': tp,
-            'risk': risk_amount,
-            'open_time': bar.name,
-            'open_bar_index': bar.name,
+            'type': 'BUY' if self._pos_type[k] == SIDE_BUY else 'SELL',
+            'volume': float(self._pos_volume[k]),
+            'price_open': float(self._pos_open[k]),
+            'sl': float(self._pos_sl[k]),
+            'tp': float(self._pos_tp[k]),
+            'risk': float(self._pos_risk[k]),
+            'open_time': self._index[self._pos_open_idx[k]],
+            'open_bar_index': int(self._pos_open_idx[k]),
             'profit': 0.0,
-            'regime': self.current_regime
+            'regime': REGIME_NAMES[self._pos_regime[k]]
         }
-        self.open_positions.append(pos)
+
+    @property
+    def open_positions(self) -> List[Dict]:
+        return [self._position_view(k) for k in range(self._pos_n) if self._pos_alive[k]]
+
+    def _open_position(self, signal_type, lot_size, price, sl, tp, risk_amount, i):
+        if self._pos_n == len(self._pos_alive):
+            self._grow_positions()
+        side = _SIDES.get(signal_type)
+        if side is None:
+            raise ValueError(f"Unknown signal type: {signal_type}")
+        k = self._pos_n
+        self._pos_ticket[k] = self.ticket_counter
+        self._pos_type[k] = side
+        self._pos_volume[k] = lot_size
+        self._pos_open[k] = price
+        self._pos_sl[k] = sl
+        self._pos_tp[k] = tp
+        self._pos_risk[k] = risk_amount
+        self._pos_open_idx[k] = i
+        self._pos_regime[k] = REGIME_CODES[self.current_regime]
+        self._pos_alive[k] = True
+        self._pos_n += 1
         self.ticket_counter += 1
         
-        emoji = "🟢" if signal_type == "BUY" else "🔴"
-        action = f"{emoji} OPEN {signal_type:<4}"
-        log_entry = f"   {bar.name} | {action} | @ {price:<9.5f} | SL {sl:<9.5f} | TP {tp:<9.5f} | Regime: {self.current_regime}"
-        self.trade_log_buffer.append(log_entry)
+        # Simpan raw; string log baru diformat saat print/export
+        self.trade_log_buffer.append(('OPEN', self._index[i], signal_type, price, sl, tp, self.current_regime))
 
-    def _close_position(self, pos, close_price, reason, bar):
-        profit = 0
-        point = self.symbol_info['point']
-        contract_size = self.symbol_info['trade_contract_size']
-        
-        entry_price = pos['price_open'] 
-        lot_size = pos['volume']
+    def _close_position(self, k, close_price, reason, i, profit=None):
+        entry_price = float(self._pos_open[k])
+        lot_size = float(self._pos_volume[k])
+        pos_type = 'BUY' if self._pos_type[k] == SIDE_BUY else 'SELL'
 
-        if pos['type'] == 'BUY':
-            price_diff = close_price - entry_price
-        else:
-            price_diff = entry_price - close_price
-            
-        profit = price_diff * contract_size * lot_size
+        if profit is None:
+            if pos_type == 'BUY':
+                price_diff = close_price - entry_price
+            else:
+                price_diff = entry_price - close_price
+            profit = price_diff * self._contract_size * lot_size
             
         self.balance += profit
         
-        regime = pos.get('regime', 'UNKNOWN')
-        if regime in self.regime_stats:
-            self.regime_stats[regime]['trades'] += 1
-            if profit > 0:
-                self.regime_stats[regime]['wins'] += 1
-            self.regime_stats[regime]['pnl'] += profit
+        code = self._pos_regime[k]
+        regime = REGIME_NAMES[code]
+        rs = self._regime_stats[code]
+        rs[0] += 1
+        rs[1] += profit > 0
+        rs[2] += profit
         
-        close_date = bar.name.date() if hasattr(bar.name, 'date') else bar.name
-        if close_date not in self.daily_pnl:
-            self.daily_pnl[close_date] = 0.0
-        self.daily_pnl[close_date] += profit
+        ts_ns = int(self._index_ns[i])
+        close_time = self._index[i]
+        d = (ts_ns - self._day0_ns) // _NS_PER_DAY
+        self._daily[d] += profit
+        self._daily_trades[d] += 1
         
         trade_log = {
-            'ticket': pos['ticket'],
-            'type': pos['type'],
+            'ticket': int(self._pos_ticket[k]),
+            'type': pos_type,
             'entry_price': entry_price,
             'close_price': close_price,
-            'sl': pos['sl'],
-            'tp': pos['tp'],
+            'sl': float(self._pos_sl[k]),
+            'tp': float(self._pos_tp[k]),
             'profit': profit,
             'reason': reason,
-            'open_time': pos['open_time'],
-            'close_time': bar.name,
+            'open_time': self._index[self._pos_open_idx[k]],
+            'close_time': close_time,
             'regime': regime
         }
         self.closed_trades.append(trade_log)
-        self.open_positions = [p for p in self.open_positions if p['ticket'] != pos['ticket']]
-        
-        emoji = "💰" if profit > 0 else "⛔"
-        action = f"{emoji} CLOSE {pos['type']:<4}"
-        profit_str = f"Profit: ${profit:8.2f}"
-        reason_str = f"Reason: {reason:<10}"
-        log_entry = f"   {bar.name} | {action} | @ {close_price:<9.5f} | {profit_str} | {reason_str}"
-        self.trade_log_buffer.append(log_entry)
-        
-        self.equity_curve.append((bar.name, self.balance))
+        self._pos_alive[k] = False
+        self._pos_dead += 1
+        
+        self.trade_log_buffer.append(('CLOSE', close_time, pos_type, close_price, profit, reason))
+        
+        self._record_equity(ts_ns)
+
+    def _make_tick(self):
+        """
+        Bangun fungsi tick yang dispesialisasi untuk run ini: konstanta symbol (spread, contract size)
+        dan objek strategy/risk manager di-capture sebagai local closure, bukan lookup atribut per bar.
+        """
+        strategy = self.strategy
+        risk_manager = self.risk_manager
+        symbol_info = self.symbol_info
+        contract_size = self._contract_size
+        spread_px = self._point * self._spread_points
+        regime_codes = self._regime_codes
+        regime_details = self._regime_details
+        feat_atr = self._feats['atr']
+        close_position = self._close_position
+        open_position = self._open_position
+
+        def tick(i, df_history_main, df_history_htf, bar):
+            """bar = baris ndarray OHLC (open, high, low, close) untuk bar ke-i."""
+            bar_high, bar_low, bar_close = float(bar[1]), float(bar[2]), float(bar[3])
+            
+            regime = REGIME_NAMES[regime_codes[i]]
+            details = regime_details[i]
+            self.current_regime = regime
+            
+            strategy.update_dynamic_confidence(regime, details)
 
-    def _tick(self, df_history_main, df_history_htf, current_bar):
-        mock_symbol_info = self._get_mock_symbol_info(current_bar)
-        
-        regime, details = self.regime_detector.detect_regime(df_history_main, use_cache=False)
-        self.current_regime = regime
-        
-        self.strategy.update_dynamic_confidence(regime, details)
+            signal_type, confidence, details = strategy.analyze(
+                df_main=df_history_main, 
+                df_htf=df_history_htf, 
+                session="london",
+                is_backtest=True
+            )
 
-        signal_type, confidence, details = self.strategy.analyze(
-            df_main=df_history_main, 
-            df_htf=df_history_htf, 
-            session="london",
-            is_backtest=True
-        )
+            if self._pos_dead:
+                self._compact_positions()
+            n = self._pos_n
+            if n:
+                hit_mask, hit_price, reason_code, profit = settle_bar(
+                    self._pos_type[:n], self._pos_open[:n], self._pos_volume[:n],
+                    self._pos_sl[:n], self._pos_tp[:n], self._pos_open_idx[:n],
+                    bar_low, bar_high, i, contract_size
+                )
+                for k in np.flatnonzero(hit_mask)[::-1]:
+                    close_position(k, float(hit_price[k]), _HIT_REASONS[reason_code[k]], i, float(profit[k]))
+
+            # Slot yang sudah kena SL/TP ditandai mati oleh alive mask, tidak perlu cek ulang per ticket.
+            # Exit rule hanya bergantung pada sisi posisi, jadi cukup dievaluasi sekali per sisi per bar.
+            exit_by_side = {}
+            for k in np.flatnonzero(self._pos_alive[:self._pos_n])[::-1]:
+                side = int(self._pos_type[k])
+                if side not in exit_by_side:
+                    exit_by_side[side] = strategy.should_close_position(self._position_view(k), details)
+                should_close, reason = exit_by_side[side]
+                if should_close:
+                    close_position(k, bar_close, reason, i)
+            
+            # analyze() mengembalikan 'NEUTRAL' (truthy) saat tidak ada signal
+            if signal_type not in _SIDES:
+                return 
+
+            is_valid, reason = strategy.validate_signal(signal_type, df_history_main, symbol_info)
+            if not is_valid:
+                return
+                
+            atr_value = feat_atr[i - 1]
+            if np.isnan(atr_value):
+                return 
 
-        for pos in reversed(self.open_positions):
-            if pos['open_bar_index'] == current_bar.name:
-                continue
+            # Mock quote: bid = close, ask = close + spread
+            entry_price = bar_close + spread_px if signal_type == "BUY" else bar_close
 
-            if pos['type'] == 'BUY':
-                if current_bar['low'] <= pos['sl']:
-                    self._close_position(pos, pos['sl'], "SL Hit", current_bar)
-                elif current_bar['high'] >= pos['tp']:
-                    self._close_position(pos, pos['tp'], "TP Hit", current_bar)
+            sl_price, tp_price = risk_manager.calculate_sl_tp(
+                entry_price, signal_type, atr_value, symbol_info
+            )
+            if sl_price is None or tp_price is None:
+                return
             
-            elif pos['type'] == 'SELL':
-                if current_bar['high'] >= pos['sl']:
-                    self._close_position(pos, pos['sl'], "SL Hit", current_bar)
-                elif current_bar['low'] <= pos['tp']:
-                    self._close_position(pos, pos['tp'], "TP Hit", current_bar)
-
-        for pos in reversed(self.open_positions):
-            if not any(p['ticket'] == pos['ticket'] for p in self.open_positions):
-                continue
+            lot_size = risk_manager.calculate_optimal_lot_size(
+                self.balance, entry_price, sl_price, symbol_info
+            )
             
-            should_close, reason = self.strategy.should_close_position(pos, details)
-            if should_close:
-                self._close_position(pos, current_bar['close'], reason, current_bar)
-        
-        if not signal_type:
-            return 
-
-        is_valid, reason = self.strategy.validate_signal(signal_type, df_history_main, mock_symbol_info)
-        if not is_valid:
-            return
+            position_risk = risk_manager.calculate_position_risk(
+                entry_price, sl_price, lot_size, symbol_info
+            )
             
-        atr_value = self.strategy.atr.calculate(df_history_main)
-        if atr_value is None:
-            return 
-
-        entry_price = mock_symbol_info['ask'] if signal_type == "BUY" else mock_symbol_info['bid']
-
-        sl_price, tp_price = self.risk_manager.calculate_sl_tp(
-            entry_price, signal_type, atr_value, self.symbol_info
-        )
-        
-        lot_size = self.risk_manager.calculate_optimal_lot_size(
-            self.balance, entry_price, sl_price, self.symbol_info
-        )
-        
-        position_risk = self.risk_manager.calculate_position_risk(
-            entry_price, sl_price, lot_size, self.symbol_info
-        )
-        
-        can_open, reason = self.risk_manager.can_open_new_position(
-            self.balance, self.open_positions, position_risk, signal_type, self.symbol_info
-        )
-        
-        if can_open:
-            self._open_position(
-                signal_type, lot_size, entry_price, 
-                sl_price, tp_price, position_risk, current_bar
+            can_open, reason = risk_manager.can_open_new_position(
+                self.balance, self.open_positions, position_risk, signal_type, symbol_info
             )
+            
+            if can_open:
+                open_position(
+                    signal_type, lot_size, entry_price, 
+                    sl_price, tp_price, position_risk, i
+                )
+
+        return tick
 
     def _calculate_drawdown(self) -> Tuple[float, float, int]:
-        if not self.equity_curve:
+        if not self._eq_n:
             return 0.0, 0.0, 0
         
-        peak = self.initial_balance
-        max_dd = 0.0
-        max_dd_pct = 0.0
-        dd_duration = 0
-        current_dd_duration = 0
+        eq = self._eq_bal[:self._eq_n]
+        # prev_peak[j] = peak sebelum titik j, peak[j] = peak setelah titik j
+        prev_peak = np.maximum.accumulate(np.concatenate(([self.initial_balance], eq)))
+        peak = prev_peak[1:]
+        dd = peak - eq
         
-        for timestamp, equity in self.equity_curve:
-            if equity > peak:
-                peak = equity
-                current_dd_duration = 0
-            else:
-                dd = peak - equity
-                dd_pct = (dd / peak * 100) if peak > 0 else 0
-                current_dd_duration += 1
-                
-                if dd > max_dd:
-                    max_dd = dd
-                    max_dd_pct = dd_pct
-                    dd_duration = current_dd_duration
+        j = int(np.argmax(dd))  # argmax = kemunculan pertama, sama dengan cek `dd > max_dd`
+        max_dd = float(dd[j])
+        if max_dd <= 0:
+            return 0.0, 0.0, 0
+        
+        max_dd_pct = (max_dd / peak[j] * 100) if peak[j] > 0 else 0
+        # Durasi = jumlah titik sejak new high terakhir sebelum titik max DD
+        new_highs = np.flatnonzero(eq[:j] > prev_peak[:j])
+        dd_duration = j - (int(new_highs[-1]) if len(new_highs) else -1)
         
-        return max_dd, max_dd_pct, dd_duration
+        return max_dd, float(max_dd_pct), dd_duration
 
     def _generate_report(self) -> Dict[str, Any]:
         total_trades = len(self.closed_trades)
@@ -319,20 +560,20 @@ class Backtester:
         
         max_dd, max_dd_pct, dd_duration = self._calculate_drawdown()
         
-        daily_values = list(self.daily_pnl.values())
-        green_days = len([d for d in daily_values if d > 0])
-        red_days = len([d for d in daily_values if d < 0])
+        daily_values = self._daily[self._daily_trades > 0]
+        green_days = int(np.count_nonzero(daily_values > 0))
+        red_days = int(np.count_nonzero(daily_values < 0))
         total_days = len(daily_values)
-        avg_daily_pnl = sum(daily_values) / total_days if total_days > 0 else 0
-        best_day = max(daily_values) if daily_values else 0
-        worst_day = min(daily_values) if daily_values else 0
+        avg_daily_pnl = float(daily_values.sum()) / total_days if total_days > 0 else 0
+        best_day = float(daily_values.max()) if total_days else 0
+        worst_day = float(daily_values.min()) if total_days else 0
         
         regime_breakdown = {}
         for regime, stats in self.regime_stats.items():
             if stats['trades'] > 0:
                 regime_breakdown[regime] = {
                     'trades': stats['trades'],
-                    'win_rate': (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0,
+                    'win_rate': stats['wins'] / stats['trades'] * 100,
                     'pnl': stats['pnl']
                 }
 
@@ -366,77 +607,41 @@ class Backtester:
         }
 
     def _format_report_text(self, report: Dict) -> str:
-        lines = []
-        
-        lines.append("=" * 60)
-        lines.append("              BACKTEST RESULTS SUMMARY".center(60))
-        lines.append("=" * 60)
-        
-        lines.append(f" Symbol: {self.symbol}")
-        lines.append(f" Timeframe: {self.timeframe}")
-        lines.append(f" Period: {report['start_date']} to {report['end_date']}")
-        lines.append(f" Strategy: AUTO")
-        lines.append("")
-        
-        lines.append(" PERFORMANCE METRICS:")
-        lines.append("-" * 60)
-        lines.append(f" Initial Balance:    ${report['initial_balance']:,.2f}")
-        lines.append(f" Final Balance:      ${report['final_balance']:,.2f}")
         pnl_sign = "+" if report['total_pnl'] >= 0 else ""
-        lines.append(f" Total P/L:          {pnl_sign}${report['total_pnl']:,.2f} ({pnl_sign}{report['total_pnl_pct']:.2f}%)")
-        lines.append("")
-        
-        lines.append(" TRADE STATISTICS:")
-        lines.append("-" * 60)
-        lines.append(f" Total Trades:       {report['total_trades']}")
-        lines.append(f" Winners:            {report['winners']} ({report['win_rate']:.1f}%)")
-        lines.append(f" Losers:             {report['losers']} ({100-report['win_rate']:.1f}%)")
-        lines.append("")
-        lines.append(f" Win Rate:           {report['win_rate']:.1f}%")
-        lines.append(f" Profit Factor:      {report['profit_factor']:.2f}")
-        lines.append("")
-        lines.append(f" Average Win:        +${report['avg_win']:.2f}")
-        lines.append(f" Average Loss:       ${report['avg_loss']:.2f}")
-        lines.append(f" Risk/Reward Ratio:  {report['risk_reward']:.2f}")
-        lines.append("")
-        lines.append(f" Best Trade:         +${report['best_trade']:.2f}")
-        lines.append(f" Worst Trade:        ${report['worst_trade']:.2f}")
-        lines.append("")
-        
-        lines.append(" DRAWDOWN ANALYSIS:")
-        lines.append("-" * 60)
-        lines.append(f" Max Drawdown:       -${report['max_drawdown']:.2f} (-{report['max_dd_pct']:.1f}%)")
-        lines.append(f" Max DD Duration:    {report['dd_duration']} bars")
-        lines.append("")
-        
-        lines.append(" CONSISTENCY:")
-        lines.append("-" * 60)
-        lines.append(f" Best Day:           +${report['best_day']:.2f}")
-        lines.append(f" Worst Day:          ${report['worst_day']:.2f}")
-        lines.append(f" Avg Daily P/L:      ${report['avg_daily_pnl']:+.2f}")
-        lines.append("")
-        
         total_days = report['total_days']
         green_pct = (report['green_days'] / total_days * 100) if total_days > 0 else 0
         red_pct = (report['red_days'] / total_days * 100) if total_days > 0 else 0
-        lines.append(f" Green Days:         {report['green_days']} / {total_days} ({green_pct:.1f}%)")
-        lines.append(f" Red Days:           {report['red_days']} / {total_days} ({red_pct:.1f}%)")
-        lines.append("")
+        
+        text = _REPORT_TEMPLATE.format_map({
+            **report,
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'pnl_sign': pnl_sign,
+            'loss_rate': 100 - report['win_rate'],
+            'green_pct': green_pct,
+            'red_pct': red_pct,
+        })
         
         if report['regime_breakdown']:
-            lines.append(" REGIME BREAKDOWN:")
-            lines.append("-" * 60)
-            
+            lines = [text, " REGIME BREAKDOWN:", "-" * 60]
             for regime, stats in sorted(report['regime_breakdown'].items(), key=lambda x: x[1]['pnl'], reverse=True):
                 pnl_sign = "+" if stats['pnl'] >= 0 else ""
                 lines.append(f" {regime:<12} {stats['trades']:>3} trades | Win: {stats['win_rate']:>5.1f}% | {pnl_sign}${stats['pnl']:>8,.2f}")
             lines.append("")
+            text = "\n".join(lines)
         
-        lines.append("=" * 60)
-        lines.append("               END OF REPORT".center(60))
-        lines.append("=" * 60)
+        return text + "\n" + _REPORT_FOOTER
+
+    @staticmethod
+    def _format_log_entry(row: Tuple) -> str:
+        if row[0] == 'OPEN':
+            _, ts, signal_type, price, sl, tp, regime = row
+            emoji = "🟢" if signal_type == "BUY" else "🔴"
+            return f"   {ts} | {emoji} OPEN {signal_type:<4} | @ {price:<9.5f} | SL {sl:<9.5f} | TP {tp:<9.5f} | Regime: {regime}"
         
-        return "\n".join(lines)
+        _, ts, pos_type, close_price, profit, reason = row
+        emoji = "💰" if profit > 0 else "⛔"
+        return f"   {ts} | {emoji} CLOSE {pos_type:<4} | @ {close_price:<9.5f} | Profit: ${profit:8.2f} | Reason: {reason:<10}"
 
     def _export_results(self, report: Dict, silent: bool = False):
         try:
@@ -455,8 +660,8 @@ class Backtester:
                 f.write("=" * 60 + "\n")
                 
                 if self.trade_log_buffer:
-                    for log_entry in self.trade_log_buffer:
-                        f.write(log_entry + "\n")
+                    f.write("\n".join(map(self._format_log_entry, self.trade_log_buffer)))
+                    f.write("\n")
                 else:
                     f.write("No trades executed.\n")
             
@@ -481,15 +686,12 @@ class Backtester:
             display_logs = self.trade_log_buffer[-20:] if len(self.trade_log_buffer) > 20 else self.trade_log_buffer
             if len(self.trade_log_buffer) > 20:
                 print(f"... (showing last 20 of {len(self.trade_log_buffer)} trades)")
-            for log_entry in display_logs:
-                print(log_entry)
+            for row in display_logs:
+                print(self._format_log_entry(row))
 
         print("\n" + self._format_report_text(report))
 
-    def run(self, custom_settings: Dict = None, silent: bool = True) -> Dict[str, Any]:
-        if not silent:
-            print(f"Running backtest for {self.symbol} ({self.timeframe})...")
-        
+    def _prepare_run(self, custom_settings: Dict = None, silent: bool = True) -> bool:
         self._apply_custom_settings(custom_settings)
         self._reset_stats()
         
@@ -498,23 +700,27 @@ class Backtester:
             self.end_date = datetime.fromisoformat(self.bt_config['end_date'])
         except KeyError as e:
             if not silent: print(f"Error: Backtesting config missing: {e}")
-            return {}
+            return False
         except ValueError as e:
             if not silent: print(f"Error: Invalid date format in settings: {e}")
-            return {}
+            return False
 
         if not silent:
             print(f"Period: {self.start_date} to {self.end_date}")
-        
+        return True
+
+    def _load_data(self, silent: bool = True):
+        """Koneksi MT5 + ambil data main & HTF. Return (all_data_main, all_data_htf) atau None."""
         if not self.mt5.connect():
             if not silent: print("Failed to connect to MT5. Aborting backtest.")
-            return {}
+            return None
 
         self.symbol_info = self.mt5.get_symbol_info(self.symbol)
         if not self.symbol_info:
             if not silent: print(f"Failed to get symbol info for {self.symbol}. Aborting.")
             self.mt5.disconnect()
-            return {}
+            return None
+        self._cache_symbol_constants()
 
         htf_timeframe = self.settings['signal_requirements'].get('higher_timeframe', 'H4')
         all_data_htf = self.mt5.get_rates_range(
@@ -523,7 +729,7 @@ class Backtester:
         if all_data_htf is None or len(all_data_htf) < 50:
             if not silent: print(f"Not enough HTF ({htf_timeframe}) data found. Aborting.")
             self.mt5.disconnect()
-            return {}
+            return None
 
         all_data_main = self.mt5.get_rates_range(
             self.symbol, self.timeframe, self.start_date, self.end_date
@@ -533,18 +739,36 @@ class Backtester:
             if not silent: 
                 print(f"Not enough data found (Need {self.min_bars_needed}, got {len(all_data_main) if all_data_main is not None else 0}).")
             self.mt5.disconnect()
-            return {}
-            
+            return None
+        
+        return all_data_main, all_data_htf
+
+    def _simulate(self, all_data_main: pd.DataFrame, all_data_htf: pd.DataFrame, silent: bool = True) -> Dict[str, Any]:
+        """Loop simulasi bar-per-bar di atas data yang sudah dimuat (tanpa I/O MT5)."""
+        if self.downcast_ohlc:
+            # OHLC float32 -> working set separuh; balance/profit tetap float64 (harga di-cast via float())
+            all_data_main = all_data_main.astype({c: np.float32 for c in _OHLC_COLS})
+            all_data_htf = all_data_htf.astype({c: np.float32 for c in _OHLC_COLS})
         if not silent:
             print("Calibrating regime detector...")
         cal_bars = min(500, len(all_data_main))
         self.regime_detector.calibrate_thresholds(all_data_main.iloc[:cal_bars])
+        self._regime_codes, self._regime_details = self.regime_detector.precompute(all_data_main, self.min_bars_needed)
+        self._feats = self.strategy.precompute(all_data_main)
 
         if not silent:
             print(f"Starting simulation over {len(all_data_main)} bars...")
         
-        all_data_htf = all_data_htf.reindex(all_data_main.index, method='ffill')
+        self._index = all_data_main.index
+        self._index_ns = self._index.values.astype('datetime64[ns]').view('i8')
+        ohlc = all_data_main[list(_OHLC_COLS)].to_numpy()
+        # HTF tetap compact: htf_end[j] = jumlah bar HTF yang sudah open pada waktu bar main ke-j
+        htf_ns = all_data_htf.index.values.astype('datetime64[ns]').view('i8')
+        htf_end = np.searchsorted(htf_ns, self._index_ns, side='right')
+        day0_ns = self._index[0].normalize().value
+        self._reset_daily_pnl(day0_ns, (self._index[-1].value - day0_ns) // _NS_PER_DAY + 1)
         
+        tick = self._tick_fn = self._make_tick()
         total_bars = len(all_data_main)
         for i in range(self.min_bars_needed, total_bars):
             
@@ -552,20 +776,36 @@ class Backtester:
                 progress_pct = (i / total_bars) * 100
                 print(f"   Progress: {i} / {total_bars} bars ({progress_pct:.1f}%)", end="\r")
             
-            current_df_history_main = all_data_main.iloc[0:i] 
-            current_df_history_htf = all_data_htf.iloc[0:i]
-            current_bar = all_data_main.iloc[i] 
+            # Window ekor berukuran tetap (view, bukan copy) -> kerja per bar O(window), bukan O(i)
+            window_start = max(0, i - self.history_window)
+            current_df_history_main = all_data_main.iloc[window_start:i]
+            end_htf = htf_end[i - 1]
+            current_df_history_htf = all_data_htf.iloc[max(0, end_htf - self.history_window):end_htf]
             
-            self._tick(current_df_history_main, current_df_history_htf, current_bar)
+            tick(i, current_df_history_main, current_df_history_htf, ohlc[i])
 
         if not silent:
             print(f"\nBacktest loop finished. Closing all open positions...")
         
-        last_bar = all_data_main.iloc[-1]
-        for pos in reversed(self.open_positions):
-            self._close_position(pos, last_bar['close'], "End of Backtest", last_bar)
+        last_i = total_bars - 1
+        for k in range(self._pos_n - 1, -1, -1):
+            if self._pos_alive[k]:
+                self._close_position(k, float(ohlc[last_i, 3]), "End of Backtest", last_i)
+
+        return self._generate_report()
 
-        report = self._generate_report()
+    def run(self, custom_settings: Dict = None, silent: bool = True) -> Dict[str, Any]:
+        if not silent:
+            print(f"Running backtest for {self.symbol} ({self.timeframe})...")
+        
+        if not self._prepare_run(custom_settings, silent):
+            return {}
+        
+        data = self._load_data(silent)
+        if data is None:
+            return {}
+        
+        report = self._simulate(*data, silent=silent)
         
         if not silent:
             self._print_results(report)
@@ -575,4 +815,48 @@ class Backtester:
         
         self.mt5.disconnect()
         
-        return report
\ No newline at end of file
+        return report
+
+    def run_sweep(self, param_sets: List[Dict], max_workers: int = None) -> List[Dict[str, Any]]:
+        """
+        Parameter sweep paralel (multiprocess). Data MT5 dimuat sekali dengan base settings,
+        lalu setiap worker menjalankan _simulate() untuk tiap custom_settings.
+        Catatan: param set tidak boleh mengganti symbol/timeframe/higher_timeframe.
+        Return list report sesuai urutan param_sets (tanpa export file per run).
+        """
+        if not param_sets:
+            return []
+        if not self._prepare_run(None):
+            return []
+        
+        data = self._load_data()
+        if data is None:
+            return []
+        self.mt5.disconnect()
+        
+        all_data_main, all_data_htf = data
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_sweep_init,
+            initargs=(self.base_sm, self.symbol_info, all_data_main, all_data_htf, self.min_bars_needed)
+        ) as pool:
+            return list(pool.map(_sweep_run, param_sets))
+
+
+# State per proses worker untuk run_sweep (diisi sekali oleh initializer)
+_SWEEP_STATE: Dict[str, Any] = {}
+
+
+def _sweep_init(sm, symbol_info, all_data_main, all_data_htf, min_bars_needed):
+    bt = Backtester(None, sm)
+    bt.min_bars_needed = min_bars_needed
+    _SWEEP_STATE.update(bt=bt, symbol_info=symbol_info, main=all_data_main, htf=all_data_htf)
+
+
+def _sweep_run(custom_settings):
+    bt = _SWEEP_STATE['bt']
+    if not bt._prepare_run(custom_settings):
+        return {}
+    bt.symbol_info = dict(_SWEEP_STATE['symbol_info'])
+    bt._cache_symbol_constants()
+    return bt._simulate(_SWEEP_STATE['main'], _SWEEP_STATE['htf'])
@@ -1,8 +1,81 @@
+import atexit
 import csv
+import io
+import json
+import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import threading
+from collections import deque
 import shutil
+import numpy as np
 import pandas as pd
+from utils._timefmt import now_str
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Batch flush log: tulis ke disk tiap interval ini atau saat antrian mencapai batch size
+FLUSH_INTERVAL_SEC = 0.5
+FLUSH_BATCH_SIZE = 256
+WRITE_BUFFER_SIZE = 1 << 16
+# Kolom yang dibutuhkan untuk statistik (kolom lain tidak di-parse)
+TRADE_USECOLS = ['timestamp', 'ticket']
+TRADE_DTYPES = {'timestamp': str, 'ticket': str}
+EXIT_USECOLS = ['timestamp', 'ticket', 'profit']
+EXIT_DTYPES = {'timestamp': str, 'ticket': str}
+
+# Rotasi errors.log
+ERROR_LOG_MAX_BYTES = 10_000_000
+ERROR_LOG_BACKUPS = 5
+
+# QueueListener errors.log per path (dibuat sekali per proses, dihentikan saat exit)
+_error_listeners = {}
+_error_listeners_lock = threading.Lock()
+
+
+def _stop_error_listener(listener):
+    listener.stop()
+    for h in listener.handlers:
+        h.close()
+
+
+def _error_log_queue(path):
+    """Queue milik listener errors.log untuk path ini; listener + RotatingFileHandler dibuat sekali."""
+    path = os.path.abspath(path)
+    with _error_listeners_lock:
+        log_q = _error_listeners.get(path)
+        if log_q is None:
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=ERROR_LOG_MAX_BYTES, backupCount=ERROR_LOG_BACKUPS, encoding='utf-8'
+            )
+            handler.setFormatter(logging.Formatter('[%(asctime)s] [%(error_type)s] %(message)s', '%Y-%m-%d %H:%M:%S'))
+            log_q = queue.Queue(-1)
+            listener = logging.handlers.QueueListener(log_q, handler)
+            listener.start()
+            atexit.register(_stop_error_listener, listener)
+            _error_listeners[path] = log_q
+        return log_q
+
+
+# Karakter yang membuat csv.writer meng-quote field
+_CSV_SPECIAL = frozenset(',"\r\n')
+
+
+def _fast_csv_line(row):
+    """
+    Baris CSV via str.join untuk field numerik/enum biasa (hasil sama dengan csv.writer).
+    Return None jika ada field yang perlu di-quote -> pakai csv.writer.
+    """
+    fields = ['' if v is None else str(v) for v in row]
+    for f in fields:
+        if not _CSV_SPECIAL.isdisjoint(f):
+            return None
+    return ','.join(fields) + '\r\n'
 
 class Logger:
     def __init__(self, log_dir='logs'):
@@ -11,6 +84,7 @@ class Logger:
         self.exits_file = os.path.join(log_dir, 'trade_exits.csv')
         self.signals_file = os.path.join(log_dir, 'signals.csv')
         self.errors_file = os.path.join(log_dir, 'errors.log')
+        self.stats_file = os.path.join(log_dir, 'stats.json')
         
         os.makedirs(log_dir, exist_ok=True)
         
@@ -29,6 +103,285 @@ class Logger:
             'bb_signal', 'stoch_signal', 'atr_value', 'volatility',
             'action_taken', 'reason'
         ])
+        
+        # File handle persisten + antrian baris; ditulis batch oleh thread flusher
+        self._lock = threading.RLock()
+        # Urutan tulis antar flush (thread flusher vs flush() eksplisit); I/O tidak di bawah _lock
+        self._io_lock = threading.Lock()
+        self._queue = deque()
+        self._wakeup = threading.Event()
+        self._closed = False
+        
+        # Agregat statistik berjalan (di-update per log, bukan scan ulang CSV)
+        self._stats = None
+        self._today_stats = None
+        # ticket entry -> jumlah exit tercatat; exit tanpa entry tidak dihitung (sama dengan left merge)
+        self._ticket_exits = {}
+        self._stats_dirty = False
+        
+        self._trades_fh, self._trades_writer = self._open_csv(self.trades_file)
+        self._exits_fh, self._exits_writer = self._open_csv(self.exits_file)
+        self._signals_fh, self._signals_writer = self._open_csv(self.signals_file)
+        self._setup_error_log()
+        
+        self._load_stats()
+        
+        self._flusher = threading.Thread(target=self._flush_loop, name='LoggerFlush', daemon=True)
+        self._flusher.start()
+        atexit.register(self._drain_and_close)
+    
+    def _setup_error_log(self):
+        """errors.log lewat stdlib logging: QueueHandler -> QueueListener (thread) -> RotatingFileHandler."""
+        self._log_q = _error_log_queue(self.errors_file)
+
+        # Satu logger per file supaya beberapa instance Logger tidak saling dobel
+        self._logger = logging.getLogger(f"bot.{os.path.abspath(self.errors_file)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.DEBUG)
+        for h in list(self._logger.handlers):
+            self._logger.removeHandler(h)
+        self._logger.addHandler(logging.handlers.QueueHandler(self._log_q))
+
+    def _open_csv(self, filepath):
+        fh = open(filepath, 'a', newline='', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+        return fh, csv.writer(fh)
+
+    def _enqueue(self, fh, writer, payload):
+        """writer=None -> payload adalah baris CSV siap tulis."""
+        if writer is not None:
+            line = _fast_csv_line(payload)
+            if line is not None:
+                writer, payload = None, line
+        with self._lock:
+            self._queue.append((fh, writer, payload))
+            if len(self._queue) >= FLUSH_BATCH_SIZE:
+                self._wakeup.set()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(FLUSH_INTERVAL_SEC)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Tulis semua baris yang masih antri ke disk."""
+        with self._io_lock:
+            # Ambil batch + snapshot stats di bawah _lock, tulis di luarnya supaya
+            # _enqueue di thread trading tidak menunggu disk
+            with self._lock:
+                if not self._queue and not self._stats_dirty:
+                    return
+                batch, self._queue = self._queue, deque()
+                stats_snap = self._stats_snapshot() if self._stats_dirty else None
+                self._stats_dirty = False
+            touched = set()
+            try:
+                for fh, writer, payload in batch:
+                    if writer is None:
+                        fh.write(payload)
+                    else:
+                        writer.writerow(payload)
+                    touched.add(fh)
+                for fh in touched:
+                    fh.flush()
+                if stats_snap is not None:
+                    self._save_stats(stats_snap)
+            except (IOError, ValueError) as e:
+                print(f"CRITICAL: Failed to flush logs: {e}")
+                if stats_snap is not None:
+                    with self._lock:
+                        self._stats_dirty = True
+
+    def _load_stats(self):
+        """Load snapshot stats.json; jika tidak cocok dengan ukuran CSV saat ini, hitung ulang dari CSV."""
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                snap = json.load(f)
+            if snap.get('file_sizes') == self._journal_sizes():
+                self._stats = snap['all']
+                self._today_stats = snap['today']
+                self._today_stats['tickets'] = set(self._today_stats['tickets'])
+                self._ticket_exits = snap['tickets']
+                return
+        except (IOError, ValueError, KeyError, TypeError):
+            pass
+        self._rebuild_stats()
+
+    def _journal_sizes(self):
+        return [os.path.getsize(p) if os.path.exists(p) else 0 for p in (self.trades_file, self.exits_file)]
+
+    def _new_today_stats(self, today):
+        # repeats: exit kedua dst. untuk ticket hari ini (baris merge tambahan, lihat _track_exit)
+        return {'date': today, 'tickets': set(), 'repeats': 0, 'closed': 0, 'wins': 0, 'total_profit': 0.0}
+
+    def _rebuild_stats(self):
+        today = now_str()[:10]
+        self._stats = {'entries': 0, 'closed': 0, 'wins': 0, 'total_profit': 0.0, 'best': 0.0, 'worst': 0.0}
+        self._today_stats = self._new_today_stats(today)
+        self._ticket_exits = {}
+
+        try:
+            combined_df = self._get_combined_trades_df()
+        except Exception as e:
+            self.log_error(f"Failed to read trades file for stats: {e}")
+            combined_df = None
+        # Set dirty setelah baca CSV (flush di dalamnya tidak boleh menyimpan stats yang belum lengkap)
+        self._stats_dirty = True
+        if combined_df is None:
+            return
+
+        ts = combined_df['timestamp']
+        if ts.is_monotonic_increasing:
+            # CSV append-only -> baris hari ini adalah suffix; cari batasnya dengan binary search
+            start = ts.to_numpy().searchsorted(np.datetime64(today))
+            todays = combined_df.iloc[start:]
+            today_closed = todays[todays['status'] == 'CLOSED']
+            tickets = set(todays['ticket'].astype(str))
+            self._today_stats.update({
+                'tickets': tickets,
+                'repeats': len(todays) - len(tickets),
+                'closed': len(today_closed),
+                'wins': int((today_closed['profit'] > 0).sum()),
+                'total_profit': float(today_closed['profit'].sum()),
+            })
+        else:
+            # Urutan waktu rusak (mis. jam sistem mundur) -> scan ekor file
+            self._today_stats = self._scan_today_stats(today)
+
+        closed = combined_df[combined_df['status'] == 'CLOSED']
+        profits = closed['profit']
+        self._ticket_exits = dict.fromkeys(combined_df['ticket'].astype(str), 0)
+        # Semua baris exit (termasuk profit kosong yang tetap OPEN) menambah baris merge
+        exited = combined_df.loc[combined_df['timestamp_exit'].notna(), 'ticket']
+        self._ticket_exits.update(exited.astype(str).value_counts().to_dict())
+        self._stats.update({
+            'entries': len(combined_df),
+            'closed': len(closed),
+            'wins': int((profits > 0).sum()),
+            'total_profit': float(profits.sum()),
+            'best': float(profits.max()) if not profits.empty else 0.0,
+            'worst': float(profits.min()) if not profits.empty else 0.0,
+        })
+
+    def _iter_todays_rows(self, filepath, today_str, block_size=1 << 16):
+        """
+        Baca CSV dari belakang per blok dan yield baris (sudah di-parse) bertanggal today_str,
+        berhenti di baris pertama yang lebih lama. Biaya O(baris hari ini), bukan O(file).
+        """
+        prefix = today_str.encode()
+        try:
+            f = open(filepath, 'rb')
+        except IOError:
+            return
+        with f:
+            pos = f.seek(0, os.SEEK_END)
+            tail = b''
+            while pos > 0:
+                step = min(block_size, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + tail).split(b'\n')
+                # Baris pertama blok bisa terpotong -> simpan untuk blok berikutnya
+                tail = lines.pop(0) if pos > 0 else b''
+                for line in reversed(lines):
+                    line = line.strip(b'\r')
+                    if not line:
+                        continue
+                    if not line.startswith(prefix):
+                        return
+                    yield next(csv.reader([line.decode('utf-8')]))
+
+    def _scan_today_stats(self, today):
+        """Statistik hari ini dari ekor trades.csv / trade_exits.csv."""
+        stats = self._new_today_stats(today)
+        for row in self._iter_todays_rows(self.trades_file, today):
+            stats['tickets'].add(row[1])
+        seen = set()
+        for row in self._iter_todays_rows(self.exits_file, today):
+            if row[1] in stats['tickets']:
+                if row[1] in seen:
+                    stats['repeats'] += 1
+                seen.add(row[1])
+                p = self._exit_profit(row[3])
+                if p is None:
+                    continue
+                stats['closed'] += 1
+                stats['wins'] += p > 0
+                stats['total_profit'] += p
+        return stats
+
+    def _stats_snapshot(self):
+        """Salinan stats untuk ditulis di luar _lock (dipanggil di bawah _lock)."""
+        return {
+            'all': dict(self._stats),
+            'tickets': dict(self._ticket_exits),
+            'today': dict(self._today_stats, tickets=sorted(self._today_stats['tickets'])),
+        }
+
+    def _save_stats(self, snap):
+        # Ukuran CSV diambil setelah batch yang sama ditulis -> cocok dengan isi snapshot
+        snap['file_sizes'] = self._journal_sizes()
+        tmp_path = f"{self.stats_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snap, f)
+        os.replace(tmp_path, self.stats_file)
+
+    def _roll_today(self):
+        today = now_str()[:10]
+        if self._today_stats['date'] != today:
+            self._today_stats = self._new_today_stats(today)
+            self._stats_dirty = True
+
+    def _track_entry(self, ticket):
+        self._roll_today()
+        ticket = str(ticket)
+        self._stats['entries'] += 1
+        self._ticket_exits.setdefault(ticket, 0)
+        self._today_stats['tickets'].add(ticket)
+        self._stats_dirty = True
+
+    def _track_exit(self, ticket, profit):
+        ticket = str(ticket)
+        n_exits = self._ticket_exits.get(ticket)
+        if n_exits is None:
+            # Tidak ada baris entry -> _rebuild_stats (left merge) juga tidak menghitungnya
+            return
+        st = self._stats
+        self._roll_today()
+        today = self._today_stats
+        if n_exits:
+            # Exit kedua untuk ticket yang sama = baris merge tambahan
+            st['entries'] += 1
+            if ticket in today['tickets']:
+                today['repeats'] += 1
+        self._ticket_exits[ticket] = n_exits + 1
+        self._stats_dirty = True
+        p = self._exit_profit(profit)
+        if p is None:
+            # Profit kosong/non-numerik -> baris tetap OPEN, sama dengan _rebuild_stats
+            return
+        st['best'] = max(st['best'], p) if st['closed'] else p
+        st['worst'] = min(st['worst'], p) if st['closed'] else p
+        st['closed'] += 1
+        st['wins'] += p > 0
+        st['total_profit'] += p
+
+        if ticket in today['tickets']:
+            today['closed'] += 1
+            today['wins'] += p > 0
+            today['total_profit'] += p
+
+    def _drain_and_close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self.flush()
+        for fh in (self._trades_fh, self._exits_fh, self._signals_fh):
+            try:
+                fh.close()
+            except IOError:
+                pass
     
     def _init_csv(self, filepath, headers):
         if not os.path.exists(filepath):
@@ -39,6 +392,11 @@ class Logger:
             except IOError as e:
                 print(f"Error initializing CSV {filepath}: {e}")
 
+    def _exit_profit(self, value):
+        """Profit exit sebagai float, None jika kosong/non-numerik/NaN (baris dianggap OPEN)."""
+        p = self._safe_float(value, None)
+        return None if p is None or p != p else p
+
     def _safe_float(self, value, default=0.0):
         if value is None:
             return default
@@ -48,72 +406,61 @@ class Logger:
             return default
 
     def log_trade_entry(self, order_info):
-        try:
-            with open(self.trades_file, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    order_info.get('ticket', ''),
-                    order_info.get('symbol', ''),
-                    order_info.get('type', ''),
-                    order_info.get('lot', ''),
-                    order_info.get('entry', ''),
-                    order_info.get('sl', ''),
-                    order_info.get('tp', ''),
-                    order_info.get('risk', ''),
-                    order_info.get('confidence', ''),
-                    'OPEN'
-                ])
-        except IOError as e:
-            self.log_error(f"Failed to log trade entry: {e}")
+        row = [
+            now_str(),
+            order_info.get('ticket', ''),
+            order_info.get('symbol', ''),
+            order_info.get('type', ''),
+            order_info.get('lot', ''),
+            order_info.get('entry', ''),
+            order_info.get('sl', ''),
+            order_info.get('tp', ''),
+            order_info.get('risk', ''),
+            order_info.get('confidence', ''),
+            'OPEN'
+        ]
+        with self._lock:
+            self._enqueue(self._trades_fh, self._trades_writer, row)
+            self._track_entry(row[1])
 
     def log_trade_exit(self, ticket, close_price, profit, duration, reason):
-        try:
-            with open(self.exits_file, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    ticket,
-                    close_price,
-                    profit,
-                    duration,
-                    reason
-                ])
-        except IOError as e:
-            self.log_error(f"Failed to log trade exit for ticket {ticket}: {e}")
+        row = [
+            now_str(),
+            ticket,
+            close_price,
+            profit,
+            duration,
+            reason
+        ]
+        with self._lock:
+            self._enqueue(self._exits_fh, self._exits_writer, row)
+            self._track_exit(ticket, profit)
 
     def log_signal(self, signal_type, confidence, details, action_taken, reason):
         signals = details.get('signals', {})
         
-        try:
-            with open(self.signals_file, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'XAUUSD',
-                    signal_type if signal_type else 'NONE',
-                    confidence,
-                    signals.get('ma', ''),
-                    signals.get('rsi', ''),
-                    signals.get('rsi_value', ''),
-                    signals.get('macd', ''),
-                    signals.get('bb', ''),
-                    signals.get('stoch', ''),
-                    signals.get('atr', ''),
-                    signals.get('volatility', ''),
-                    action_taken,
-                    reason
-                ])
-        except IOError as e:
-            self.log_error(f"Failed to log signal: {e}")
+        self._enqueue(self._signals_fh, self._signals_writer, [
+            now_str(),
+            'XAUUSD',
+            signal_type if signal_type else 'NONE',
+            confidence,
+            signals.get('ma', ''),
+            signals.get('rsi', ''),
+            signals.get('rsi_value', ''),
+            signals.get('macd', ''),
+            signals.get('bb', ''),
+            signals.get('stoch', ''),
+            signals.get('atr', ''),
+            signals.get('volatility', ''),
+            action_taken,
+            reason
+        ])
     
     def log_error(self, error_message, error_type='ERROR', exc_info=False):
-        try:
-            with open(self.errors_file, 'a', encoding='utf-8') as f:
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                f.write(f"[{timestamp}] [{error_type}] {error_message}\n")
-        except IOError as e:
-            print(f"CRITICAL: Failed to write to error log: {e}")
+        level = logging.getLevelName(error_type)
+        if not isinstance(level, int):
+            level = logging.ERROR
+        self._logger.log(level, error_message, exc_info=exc_info, extra={'error_type': error_type})
     
     def log_info(self, message):
         self.log_error(message, error_type='INFO', exc_info=False)
@@ -121,106 +468,92 @@ class Logger:
     def log_warning(self, message):
         self.log_error(message, error_type='WARNING', exc_info=False)
     
+    @staticmethod
+    def _parse_csv(buf, **kwargs):
+        """pd.read_csv dengan engine pyarrow jika tersedia, fallback ke engine C."""
+        if HAS_PYARROW:
+            try:
+                return pd.read_csv(io.BytesIO(buf), engine='pyarrow', **kwargs)
+            except (ValueError, TypeError):
+                pass
+        return pd.read_csv(io.BytesIO(buf), engine='c', **kwargs)
+
+    def _read_csv(self, filepath, usecols=None, dtype=None):
+        """Baca CSV penuh (hanya saat rebuild stats); hanya kolom usecols yang di-parse."""
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        if not raw:
+            raise pd.errors.EmptyDataError(f"{filepath} is empty")
+        return self._parse_csv(raw, usecols=usecols, dtype=dtype)
+
     def _get_combined_trades_df(self):
+        self.flush()
         try:
-            trades_df = pd.read_csv(self.trades_file)
+            trades_df = self._read_csv(self.trades_file, TRADE_USECOLS, TRADE_DTYPES)
         except FileNotFoundError:
             return None
         except pd.errors.EmptyDataError:
             return None
 
         try:
-            exits_df = pd.read_csv(self.exits_file)
+            exits_df = self._read_csv(self.exits_file, EXIT_USECOLS, EXIT_DTYPES)
         except FileNotFoundError:
             exits_df = pd.DataFrame(columns=['ticket', 'profit', 'timestamp_exit'])
         except pd.errors.EmptyDataError:
             exits_df = pd.DataFrame(columns=['ticket', 'profit', 'timestamp_exit'])
 
         if exits_df.empty:
-            trades_df['status'] = 'OPEN'
-            trades_df['profit'] = 0.0
-            trades_df['timestamp_exit'] = pd.NaT
-            return trades_df
-
-        exits_df = exits_df.rename(columns={'timestamp': 'timestamp_exit'})
-        exits_df['ticket'] = exits_df['ticket'].astype(str)
-        trades_df['ticket'] = trades_df['ticket'].astype(str)
+            combined_df = trades_df.assign(status='OPEN', profit=0.0, timestamp_exit=pd.NaT)
+        else:
+            exits_df = exits_df.rename(columns={'timestamp': 'timestamp_exit'})
+            exits_df = exits_df.astype({'ticket': str})
+            trades_df = trades_df.astype({'ticket': str})
 
-        combined_df = pd.merge(trades_df, exits_df, on='ticket', how='left')
-        
-        combined_df['status'] = combined_df['profit'].apply(lambda x: 'CLOSED' if pd.notna(x) else 'OPEN')
-        combined_df['profit'] = combined_df['profit'].apply(lambda x: self._safe_float(x, 0.0))
+            combined_df = pd.merge(trades_df, exits_df, on='ticket', how='left')
+            
+            # Profit non-numerik dianggap kosong -> OPEN (sama dengan _track_exit)
+            profit = pd.to_numeric(combined_df['profit'], errors='coerce')
+            combined_df['status'] = np.where(profit.notna(), 'CLOSED', 'OPEN')
+            combined_df['profit'] = profit.fillna(0.0).astype(float)
         
+        combined_df['date'] = combined_df['timestamp'].astype(str).str[:10]
+        # Parse sekali ke datetime64 -> filter per tanggal bisa pakai searchsorted
+        combined_df['timestamp'] = pd.to_datetime(
+            combined_df['timestamp'], format='%Y-%m-%d %H:%M:%S', errors='coerce', cache=True
+        )
         return combined_df
 
     def get_today_trades(self):
-        today = datetime.now().strftime('%Y-%m-%d')
-        stats = {
-            'total_trades': 0, 'closed_trades': 0, 'open_trades': 0,
-            'winning_trades': 0, 'losing_trades': 0,
-            'total_profit': 0.0, 'win_rate': 0.0
-        }
-        
-        try:
-            combined_df = self._get_combined_trades_df()
-            if combined_df is None:
-                return stats
-        except Exception as e:
-            self.log_error(f"Failed to read trades file for stats: {e}")
-            return stats
-
-        trades_today = combined_df[combined_df['timestamp'].str.startswith(today)]
-        if trades_today.empty:
-            return stats
-
-        closed_trades = trades_today[trades_today['status'] == 'CLOSED']
-        open_trades = trades_today[trades_today['status'] == 'OPEN']
-        
-        stats['total_trades'] = len(trades_today)
-        stats['closed_trades'] = len(closed_trades)
-        stats['open_trades'] = len(open_trades)
-
-        if closed_trades.empty:
-            return stats
-
-        profits = closed_trades['profit']
-        winning_trades = profits[profits > 0]
-        losing_trades = profits[profits <= 0]
-        
-        stats['winning_trades'] = len(winning_trades)
-        stats['losing_trades'] = len(losing_trades)
-        stats['total_profit'] = profits.sum()
-        stats['win_rate'] = (len(winning_trades) / len(closed_trades) * 100) if not closed_trades.empty else 0
-        
-        return stats
+        with self._lock:
+            self._roll_today()
+            today = self._today_stats
+            total = len(today['tickets']) + today['repeats']
+            closed = today['closed']
+            wins = today['wins']
+            return {
+                'total_trades': total,
+                'closed_trades': closed,
+                'open_trades': total - closed,
+                'winning_trades': wins,
+                'losing_trades': closed - wins,
+                'total_profit': today['total_profit'],
+                'win_rate': (wins / closed * 100) if closed else 0.0
+            }
     
     def get_all_time_stats(self):
-        stats = {
-            'total_trades': 0, 'total_profit': 0.0, 'win_rate': 0.0,
-            'average_profit': 0.0, 'best_trade': 0.0, 'worst_trade': 0.0
-        }
-        
-        try:
-            combined_df = self._get_combined_trades_df()
-            if combined_df is None:
-                return stats
-        except Exception as e:
-            self.log_error(f"Failed to read trades file for stats: {e}")
-            return stats
-
-        closed_trades = combined_df[combined_df['status'] == 'CLOSED']
-        if closed_trades.empty:
-            stats['total_trades'] = len(combined_df)
-            return stats
-            
-        profits = closed_trades['profit']
-        winning_trades = profits[profits > 0]
-        
-        stats['total_trades'] = len(closed_trades)
-        stats['total_profit'] = profits.sum()
-        stats['win_rate'] = (len(winning_trades) / len(closed_trades) * 100) if not closed_trades.empty else 0
-        stats['average_profit'] = profits.mean() if not closed_trades.empty else 0
-        stats['best_trade'] = profits.max() if not profits.empty else 0.0
-        stats['worst_trade'] = profits.min() if not profits.empty else 0.0
-        
-        return stats
\ No newline at end of file
+        with self._lock:
+            st = self._stats
+            closed = st['closed']
+            if not closed:
+                return {
+                    'total_trades': st['entries'], 'total_profit': 0.0, 'win_rate': 0.0,
+                    'average_profit': 0.0, 'best_trade': 0.0, 'worst_trade': 0.0
+                }
+            return {
+                'total_trades': closed,
+                'total_profit': st['total_profit'],
+                'win_rate': st['wins'] / closed * 100,
+                'average_profit': st['total_profit'] / closed,
+                'best_trade': st['best'],
+                'worst_trade': st['worst']
+            }
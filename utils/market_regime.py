@@ -1,20 +1,114 @@
+import functools
+import itertools
+import time
 import pandas as pd
 import numpy as np
+from collections import deque
 from typing import Dict, Tuple, Optional
 from utils.settings_manager import SettingsManager
+from utils._regime_numba import HAS_NUMBA, compute_regime_indicators, _ewm_update
+
+# Kode integer regime (dipakai backtester untuk array int8)
+REGIME_NAMES = ('TRENDING', 'RANGING', 'VOLATILE', 'BREAKOUT', 'NEUTRAL', 'UNKNOWN')
+REGIME_CODES = {name: code for code, name in enumerate(REGIME_NAMES)}
+
+# Rekomendasi mode per regime (statis)
+_STRATEGY_REC = {
+    "TRENDING": {
+        "suggested_mode": "TREND_ONLY",
+        "lot_multiplier": 1.0,
+        "note": "Follow the trend."
+    },
+    "RANGING": {
+        "suggested_mode": "SNIPER_ONLY",
+        "lot_multiplier": 1.0,
+        "note": "Buy Support, Sell Resistance."
+    },
+    "VOLATILE": {
+        "suggested_mode": "BREAKOUT_ONLY", 
+        "lot_multiplier": 0.7, # [FIX] Naik dari 0.5 ke 0.7 biar ga kena min-lot-trap
+        "note": "High risk. Wide stops needed."
+    },
+    "BREAKOUT": {
+        "suggested_mode": "TREND_ONLY", 
+        "lot_multiplier": 1.2, 
+        "note": "Aggressive entry allowed."
+    },
+    "NEUTRAL": {
+        "suggested_mode": "SNIPER_ONLY",
+        "lot_multiplier": 0.8,
+        "note": "Scalp carefully."
+    }
+}
+
+
+@functools.lru_cache(maxsize=16)
+def _strategy(regime: str, is_high_vol: bool) -> Dict:
+    """Hasil di-cache dan dibagi antar pemanggil -> jangan dimodifikasi, copy dulu."""
+    selected = dict(_STRATEGY_REC.get(regime, _STRATEGY_REC["NEUTRAL"]))
+    
+    # [LOGIC OVERRIDE]
+    if is_high_vol and regime not in ["VOLATILE", "BREAKOUT"]:
+        selected["lot_multiplier"] *= 0.7 # Safety reduction
+        selected["note"] += " [WARNING: High Volatility]"
+        
+        # Ranging but Volatile = Whipsaw Risk -> Switch to Breakout
+        if regime == "RANGING":
+            selected["suggested_mode"] = "BREAKOUT_ONLY"
+            selected["note"] = "Ranging but Volatile -> Expect Breakout."
+    
+    return selected
+
+
+def _shift1(x: np.ndarray) -> np.ndarray:
+    """Setara Series.shift(1) untuk ndarray (elemen pertama NaN)."""
+    out = np.empty(len(x), dtype=np.float64)
+    out[:1] = np.nan
+    out[1:] = x[:-1]
+    return out
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = _shift1(close)
+    # fmax mengabaikan NaN, sama seperti max(axis=1) pandas (skipna)
+    return np.fmax.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+
+
+def _ewm(x: np.ndarray, span: int) -> np.ndarray:
+    """EWM adjust=False; x 2D -> per kolom dalam satu panggilan pandas."""
+    frame = pd.DataFrame(x) if x.ndim == 2 else pd.Series(x)
+    return frame.ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def _fillna0(x: np.ndarray) -> np.ndarray:
+    return np.where(np.isnan(x), 0.0, x)
+
 
 class MarketRegimeDetector:
     
+    # Settings dibagi antar instance (read-only), di-load ulang setelah TTL atau jika SettingsManager beda
+    SETTINGS_TTL_SEC = 60
+    _settings_entry = None  # (sm, expiry, settings)
+    
+    @classmethod
+    def _cached_settings(cls, sm: SettingsManager) -> Dict:
+        now = time.monotonic()
+        entry = cls._settings_entry
+        if entry is None or entry[0] is not sm or entry[1] < now:
+            entry = cls._settings_entry = (sm, now + cls.SETTINGS_TTL_SEC, sm.load_settings())
+        return entry[2]
+    
     def __init__(self, sm: SettingsManager, symbol: str = "XAUUSD"):
         self.sm = sm
-        self.settings = self.sm.load_settings()
+        self.settings = self._cached_settings(self.sm)
         self.symbol = symbol
         
-        self.regime_history = []
         self.max_history = 100
+        self.regime_history = deque(maxlen=self.max_history)
+        self._stability_cache = None
         
-        self.cached_indicators = {}
-        self.last_update_time = None
+        # State indikator incremental (dipakai detect_regime live), lihat _incremental_indicators
+        self._state = None
         self.last_calibration_time = None
         
         # Load initial settings
@@ -31,7 +125,7 @@ class MarketRegimeDetector:
         
         self.is_calibrated = False
         
-    def calibrate_thresholds(self, historical_data: pd.DataFrame):
+    def calibrate_thresholds(self, historical_data: pd.DataFrame, now: Optional[pd.Timestamp] = None):
         """
         Menganalisa data historis untuk menentukan ambang batas 'Volatile' dan 'Ranging' 
         secara adaptif berdasarkan kondisi pasar terkini.
@@ -62,7 +156,7 @@ class MarketRegimeDetector:
             self.bb_width_ranging_threshold = max(0.01, bb_width_pct)
             
             self.is_calibrated = True
-            self.last_calibration_time = pd.Timestamp.now()
+            self.last_calibration_time = now if now is not None else pd.Timestamp.now()
             
             # print(f"✅ [Regime] Calibrated for {self.symbol}: Volatile > {self.atr_volatile_threshold:.2f}x | Ranging < {self.bb_width_ranging_threshold*100:.2f}%")
             
@@ -78,24 +172,87 @@ class MarketRegimeDetector:
         # Auto Re-Calibration setiap 4 jam
         now = pd.Timestamp.now()
         if not self.is_calibrated or (self.last_calibration_time and (now - self.last_calibration_time).total_seconds() > 14400):
-            self.calibrate_thresholds(data)
+            self.calibrate_thresholds(data, now)
         
-        if use_cache and self._cache_is_valid(data):
-            indicators = self.cached_indicators
-        else:
-            indicators = self._calculate_all_indicators(data)
-            self.cached_indicators = indicators
-            self.last_update_time = pd.Timestamp.now()
+        if use_cache:
+            # O(bar baru) per panggilan, bukan hitung ulang seluruh history
+            current_adx, current_atr, avg_atr, current_bb_width, is_breakout = self._incremental_indicators(data)
+            return self._classify(data, current_adx, current_atr, avg_atr, current_bb_width, is_breakout, now)
         
+        indicators = self._calculate_all_indicators(data)
         if any(ind.isnull().all() for ind in indicators.values()):
             return "UNKNOWN", {"reason": "Indicator calculation failed (NaN)"}
 
         # Extract Current Values
         current_adx = indicators['adx'].iloc[-1]
         current_atr = indicators['atr'].iloc[-1]
-        avg_atr = indicators['atr'].rolling(20).mean().iloc[-1]
+        avg_atr = float(np.mean(indicators['atr'].to_numpy()[-20:]))
         current_bb_width = indicators['bb_width'].iloc[-1]
         
+        is_breakout = self._detect_breakout(
+            data['close'].to_numpy(), data['open'].to_numpy(), indicators['bb_width'].to_numpy()
+        )
+        
+        return self._classify(data, current_adx, current_atr, avg_atr, current_bb_width, is_breakout, now)
+    
+    def precompute(self, data: pd.DataFrame, start: int = 60) -> Tuple[np.ndarray, list]:
+        """
+        Hitung regime untuk semua bar sekaligus (dipakai backtester).
+        Indikator dihitung sekali atas seluruh data (semua kausal), lalu tiap bar
+        cukup membaca nilai di posisinya -> O(N) total, bukan O(N^2).
+        
+        Return (codes, details) dengan panjang len(data): elemen ke-i setara
+        dengan detect_regime(data.iloc[:i]) untuk i >= start (bar pertama yang
+        dievaluasi backtester, jadi regime_history mulai terisi di bar yang sama).
+        Seperti detect_regime, detector yang belum terkalibrasi dikalibrasi ulang
+        dari history bar tersebut sampai berhasil.
+        """
+        n = len(data)
+        required_bars = max(60, start)
+        codes = np.full(n, REGIME_CODES['UNKNOWN'], dtype=np.int8)
+        details = [{"reason": "Insufficient data"}] * n
+        if n <= required_bars:
+            return codes, details
+        
+        if HAS_NUMBA:
+            adx, atr, bbw, ma20, std20, avg_body10, avg_bbw10, avg_atr = self._fused_indicators(data)
+        else:
+            indicators = self._calculate_all_indicators(data)
+            adx = indicators['adx'].to_numpy()
+            atr = indicators['atr'].to_numpy()
+            bb_width = indicators['bb_width']
+            avg_atr = indicators['atr'].rolling(20).mean().to_numpy()
+            
+            close = data['close']
+            ma20 = close.rolling(20).mean().to_numpy()
+            std20 = close.rolling(20).std().to_numpy()
+            avg_body10 = (close - data['open']).abs().rolling(10).mean().to_numpy()
+            avg_bbw10 = bb_width.rolling(10).mean().to_numpy()
+            bbw = bb_width.to_numpy()
+        
+        c = data['close'].to_numpy()
+        body = np.abs(c - data['open'].to_numpy())
+        now = pd.Timestamp.now()
+        
+        # Flag breakout semua bar sekaligus (mask boolean, tanpa branch per bar); NaN -> False
+        is_breakout_arr = (
+            ((c > ma20 + 2.0 * std20) | (c < ma20 - 2.0 * std20))
+            & ((body > avg_body10 * 2.0) | (bbw > avg_bbw10))
+        )
+        
+        for i in range(required_bars, n):
+            if not self.is_calibrated:
+                self.calibrate_thresholds(data.iloc[:i], now)
+            p = i - 1  # bar terakhir dari history data.iloc[:i]
+            regime, det = self._classify(data.iloc[:i], adx[p], atr[p], avg_atr[p], bbw[p], bool(is_breakout_arr[p]), now)
+            codes[i] = REGIME_CODES.get(regime, REGIME_CODES['UNKNOWN'])
+            details[i] = det
+        
+        return codes, details
+    
+    def _classify(self, data: pd.DataFrame, current_adx: float, current_atr: float,
+                  avg_atr: float, current_bb_width: float, is_breakout: bool,
+                  now: Optional[pd.Timestamp] = None) -> Tuple[str, Dict]:
         atr_ratio = current_atr / avg_atr if avg_atr > 0 else 1.0
         
         current_close = data['close'].iloc[-1]
@@ -130,7 +287,7 @@ class MarketRegimeDetector:
             scores['VOLATILE'] += min(volatile_score, 100)
         
         # 4. BREAKOUT SCORE (Logic Baru)
-        if self._detect_breakout(data, indicators['adx'], indicators['bb_width']):
+        if is_breakout:
             scores['BREAKOUT'] += 150 # Prioritas SANGAT TINGGI jika terdeteksi (Override logic lain)
         
         scores['NEUTRAL'] = 30 # Baseline score
@@ -150,7 +307,7 @@ class MarketRegimeDetector:
             confidence = 1.0
 
         details = self._generate_regime_details(
-            regime, data, indicators, 
+            regime, data, current_atr,
             current_adx, atr_ratio, bb_width_pct
         )
         
@@ -162,11 +319,10 @@ class MarketRegimeDetector:
         self.regime_history.append({
             'regime': regime,
             'confidence': confidence,
-            'timestamp': pd.Timestamp.now(),
+            'timestamp': now if now is not None else pd.Timestamp.now(),
             'scores': scores
         })
-        if len(self.regime_history) > self.max_history:
-            self.regime_history.pop(0)
+        self._stability_cache = None
         
         return regime, {
             'confidence': round(confidence, 2),
@@ -174,7 +330,7 @@ class MarketRegimeDetector:
         }
     
     def _generate_regime_details(self, regime: str, data: pd.DataFrame, 
-                                 indicators: Dict, adx: float, 
+                                 current_atr: float, adx: float, 
                                  atr_ratio: float, bb_width_pct: float) -> Dict:
         
         base_details = {
@@ -192,8 +348,8 @@ class MarketRegimeDetector:
             })
         
         elif regime == "RANGING":
-            high_20 = data['high'].rolling(20).max().iloc[-1]
-            low_20 = data['low'].rolling(20).min().iloc[-1]
+            high_20 = data['high'].iloc[-20:].max()
+            low_20 = data['low'].iloc[-20:].min()
             range_pct = ((high_20 - low_20) / data['close'].iloc[-1]) * 100 if data['close'].iloc[-1] > 0 else 0
             base_details.update({
                 "range_size": f"{range_pct:.2f}%",
@@ -204,7 +360,7 @@ class MarketRegimeDetector:
         
         elif regime == "VOLATILE":
             base_details.update({
-                "current_atr": round(indicators['atr'].iloc[-1], 2),
+                "current_atr": round(current_atr, 2),
                 "recommended_stop_multiplier": round(atr_ratio * 1.5, 1)
             })
 
@@ -213,7 +369,7 @@ class MarketRegimeDetector:
             base_details.update({
                 "direction": direction,
                 "note": "MOMENTUM SURGE - DO NOT FADE",
-                "adx_momentum": float(indicators['adx'].iloc[-1]) # Cast to float just in case
+                "adx_momentum": float(adx) # Cast to float just in case
             })
         
         else: # NEUTRAL
@@ -250,49 +406,8 @@ class MarketRegimeDetector:
         else: return "MID_RANGE"
     
     def get_strategy_recommendation(self, regime: str, details: Dict) -> Dict:
-        is_high_vol = details.get('is_high_volatility', False)
-        
-        rec = {
-            "TRENDING": {
-                "suggested_mode": "TREND_ONLY",
-                "lot_multiplier": 1.0,
-                "note": "Follow the trend."
-            },
-            "RANGING": {
-                "suggested_mode": "SNIPER_ONLY",
-                "lot_multiplier": 1.0,
-                "note": "Buy Support, Sell Resistance."
-            },
-            "VOLATILE": {
-                "suggested_mode": "BREAKOUT_ONLY", 
-                "lot_multiplier": 0.7, # [FIX] Naik dari 0.5 ke 0.7 biar ga kena min-lot-trap
-                "note": "High risk. Wide stops needed."
-            },
-            "BREAKOUT": {
-                "suggested_mode": "TREND_ONLY", 
-                "lot_multiplier": 1.2, 
-                "note": "Aggressive entry allowed."
-            },
-            "NEUTRAL": {
-                "suggested_mode": "SNIPER_ONLY",
-                "lot_multiplier": 0.8,
-                "note": "Scalp carefully."
-            }
-        }
-        
-        selected = rec.get(regime, rec["NEUTRAL"])
-        
-        # [LOGIC OVERRIDE]
-        if is_high_vol and regime not in ["VOLATILE", "BREAKOUT"]:
-            selected["lot_multiplier"] *= 0.7 # Safety reduction
-            selected["note"] += " [WARNING: High Volatility]"
-            
-            # Ranging but Volatile = Whipsaw Risk -> Switch to Breakout
-            if regime == "RANGING":
-                selected["suggested_mode"] = "BREAKOUT_ONLY"
-                selected["note"] = "Ranging but Volatile -> Expect Breakout."
-
-        return selected
+        is_high_vol = bool(details.get('is_high_volatility', False))
+        return dict(_strategy(regime, is_high_vol))
     
     def get_regime_summary(self) -> str:
         if not self.regime_history:
@@ -317,19 +432,137 @@ class MarketRegimeDetector:
         return f"{emoji} {regime} [{conf_visual}] {confidence*100:.0f}% {stability_emoji}"
 
     def get_regime_stability(self) -> float:
+        # Cache di-reset setiap kali regime_history bertambah
+        if self._stability_cache is None:
+            self._stability_cache = self._compute_regime_stability()
+        return self._stability_cache
+
+    def _compute_regime_stability(self) -> float:
         if len(self.regime_history) < 5: return 0.5
-        recent_regimes = [h['regime'] for h in self.regime_history[-10:]]
+        # deque tidak bisa di-slice -> ambil 10 terakhir via reversed
+        recent_regimes = [h['regime'] for h in itertools.islice(reversed(self.regime_history), 10)][::-1]
         transitions = sum(1 for i in range(1, len(recent_regimes)) if recent_regimes[i] != recent_regimes[i-1])
         if len(recent_regimes) <= 1: return 1.0
         return 1.0 - (transitions / (len(recent_regimes) - 1))
 
-    def _cache_is_valid(self, data: pd.DataFrame) -> bool:
-        if not self.cached_indicators or self.last_update_time is None:
-            return False
-        age_seconds = (pd.Timestamp.now() - self.last_update_time).total_seconds()
-        return age_seconds < 60
+    def _new_state(self) -> Dict:
+        return {
+            'symbol': self.symbol, 'last_ts': None,
+            'prev_high': np.nan, 'prev_low': np.nan, 'prev_close': np.nan,
+            'tr_ewm': np.nan, 'pdm_ewm': np.nan, 'mdm_ewm': np.nan, 'dx_ewm': np.nan, 'atr_ewm': np.nan,
+            # Bobot lama EWM (meluruh saat input NaN, lihat _ewm_update)
+            'tr_wt': 1.0, 'pdm_wt': 1.0, 'mdm_wt': 1.0, 'dx_wt': 1.0, 'atr_wt': 1.0,
+            # Ring buffer bar yang sudah close (bar berjalan ditambahkan saat evaluasi)
+            'closes': deque(maxlen=19), 'atrs': deque(maxlen=19),
+            'bbws': deque(maxlen=9), 'bodies': deque(maxlen=9),
+        }
+
+    def _step(self, st: Dict, h: float, l: float, c: float, o: float, period: int = 14) -> Tuple:
+        """Satu langkah ADX/ATR dari state st + bar (h, l, c, o). Tidak mengubah st."""
+        alpha = 1.0 / (1.0 + (period - 1) / 2.0)
+        pc = st['prev_close']
+        tr = h - l
+        if pc == pc:
+            tr = max(tr, abs(h - pc), abs(l - pc))
+        up = h - st['prev_high']
+        down = st['prev_low'] - l
+        pdm = up if (up > down and up > 0) else 0.0
+        mdm = down if (down > up and down > 0) else 0.0
+
+        tr_w, tr_wt = _ewm_update(st['tr_ewm'], st['tr_wt'], tr, alpha)
+        pdm_w, pdm_wt = _ewm_update(st['pdm_ewm'], st['pdm_wt'], pdm, alpha)
+        mdm_w, mdm_wt = _ewm_update(st['mdm_ewm'], st['mdm_wt'], mdm, alpha)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            plus_di = 100 * (np.float64(pdm_w) / tr_w)
+            minus_di = 100 * (np.float64(mdm_w) / tr_w)
+        di_sum = plus_di + minus_di
+        dx = 100 * abs(plus_di - minus_di) / (di_sum if di_sum != 0 else 1)
+        dx_w, dx_wt = _ewm_update(st['dx_ewm'], st['dx_wt'], float(dx), alpha)
+        atr_w, atr_wt = _ewm_update(st['atr_ewm'], st['atr_wt'], tr, alpha)
+        return (tr_w, pdm_w, mdm_w, dx_w, atr_w), (tr_wt, pdm_wt, mdm_wt, dx_wt, atr_wt)
+
+    @staticmethod
+    def _bb_width_from(closes: list) -> float:
+        if len(closes) < 20:
+            return 0.0
+        return 4 * float(np.std(closes, ddof=1))
+
+    def _commit_bar(self, st: Dict, ts, h: float, l: float, c: float, o: float):
+        (tr_w, pdm_w, mdm_w, dx_w, atr_w), wts = self._step(st, h, l, c, o)
+        st.update(tr_ewm=tr_w, pdm_ewm=pdm_w, mdm_ewm=mdm_w, dx_ewm=dx_w, atr_ewm=atr_w,
+                  tr_wt=wts[0], pdm_wt=wts[1], mdm_wt=wts[2], dx_wt=wts[3], atr_wt=wts[4],
+                  prev_high=h, prev_low=l, prev_close=c, last_ts=ts)
+        closes = list(st['closes']) + [c]
+        st['closes'].append(c)
+        st['atrs'].append(0.0 if atr_w != atr_w else atr_w)
+        st['bbws'].append(self._bb_width_from(closes))
+        st['bodies'].append(abs(c - o))
+
+    def _incremental_indicators(self, data: pd.DataFrame) -> Tuple[float, float, float, float, bool]:
+        """
+        Nilai indikator bar terakhir secara incremental.
+        Semua bar kecuali yang terakhir di-commit ke state (sudah close); bar terakhir
+        (bisa masih berjalan) dievaluasi di atas state tanpa disimpan.
+        Return (adx, atr, avg_atr20, bb_width, is_breakout).
+        """
+        index = data.index
+        high, low = data['high'].to_numpy(), data['low'].to_numpy()
+        close, open_ = data['close'].to_numpy(), data['open'].to_numpy()
+        last_closed = len(data) - 2
+
+        st = self._state
+        start = 0
+        if st is not None and st['symbol'] == self.symbol and st['last_ts'] is not None:
+            pos = index.searchsorted(st['last_ts'], side='right')
+            if 0 < pos <= last_closed + 1 and index[pos - 1] == st['last_ts']:
+                start = pos
+            else:
+                st = None
+        else:
+            st = None
+        if st is None:
+            st = self._state = self._new_state()
+
+        for k in range(start, last_closed + 1):
+            self._commit_bar(st, index[k], float(high[k]), float(low[k]), float(close[k]), float(open_[k]))
+
+        h, l, c, o = float(high[-1]), float(low[-1]), float(close[-1]), float(open_[-1])
+        (_, _, _, dx_w, atr_w), _ = self._step(st, h, l, c, o)
+        current_adx = 0.0 if dx_w != dx_w else dx_w
+        current_atr = 0.0 if atr_w != atr_w else atr_w
+
+        atrs = list(st['atrs']) + [current_atr]
+        avg_atr = float(np.mean(atrs)) if len(atrs) == 20 else np.nan
+
+        closes = list(st['closes']) + [c]
+        current_bbw = self._bb_width_from(closes)
+
+        is_breakout = False
+        if len(data) >= 20:
+            ma = float(np.mean(closes))
+            std = float(np.std(closes, ddof=1))
+            is_price_breakout = c > ma + 2.0 * std or c < ma - 2.0 * std
+            bodies = list(st['bodies']) + [abs(c - o)]
+            bbws = list(st['bbws']) + [current_bbw]
+            is_impulse_candle = abs(c - o) > float(np.mean(bodies)) * 2.0
+            is_bb_expanding = len(bbws) == 10 and current_bbw > float(np.mean(bbws))
+            is_breakout = is_price_breakout and (is_impulse_candle or is_bb_expanding)
+
+        return current_adx, current_atr, avg_atr, current_bbw, is_breakout
     
+    def _fused_indicators(self, data: pd.DataFrame) -> Tuple[np.ndarray, ...]:
+        """Semua indikator regime via satu kernel numba (lihat utils/_regime_numba.py)."""
+        cols = [np.ascontiguousarray(data[k].to_numpy(), dtype=np.float64) for k in ('high', 'low', 'close', 'open')]
+        return compute_regime_indicators(*cols)
+
     def _calculate_all_indicators(self, data: pd.DataFrame) -> Dict:
+        if HAS_NUMBA:
+            adx, atr, bb_width = self._fused_indicators(data)[:3]
+            return {
+                'adx': pd.Series(adx, index=data.index),
+                'atr': pd.Series(atr, index=data.index),
+                'bb_width': pd.Series(bb_width, index=data.index)
+            }
         return {
             'adx': self._calculate_adx(data),
             'atr': self._calculate_atr(data),
@@ -337,64 +570,60 @@ class MarketRegimeDetector:
         }
     
     def _calculate_adx(self, data: pd.DataFrame, period: int = 14) -> pd.Series:
-        high, low, close = data['high'], data['low'], data['close']
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        
-        up_move = high - high.shift()
-        down_move = low.shift() - low
-        
-        plus_dm = pd.Series(0.0, index=data.index)
-        minus_dm = pd.Series(0.0, index=data.index)
-        
-        plus_dm[(up_move > down_move) & (up_move > 0)] = up_move
-        minus_dm[(down_move > up_move) & (down_move > 0)] = down_move
-        
-        atr = tr.ewm(span=period, adjust=False).mean()
-        plus_di = 100 * (plus_dm.ewm(span=period, adjust=False).mean() / atr)
-        minus_di = 100 * (minus_dm.ewm(span=period, adjust=False).mean() / atr)
-        dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di).replace(0, 1)
-        return dx.ewm(span=period, adjust=False).mean().fillna(0)
+        high, low, close = data['high'].to_numpy(), data['low'].to_numpy(), data['close'].to_numpy()
+        tr = _true_range(high, low, close)
+        
+        up_move = np.diff(high, prepend=np.nan)
+        down_move = -np.diff(low, prepend=np.nan)
+        
+        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # TR, +DM, -DM di-smooth bersama (satu ewm 2D, bukan tiga Series)
+            atr, plus_sm, minus_sm = _ewm(np.column_stack((tr, plus_dm, minus_dm)), period).T
+            plus_di = 100 * (plus_sm / atr)
+            minus_di = 100 * (minus_sm / atr)
+            di_sum = plus_di + minus_di
+            dx = 100 * np.abs(plus_di - minus_di) / np.where(di_sum == 0, 1, di_sum)
+        return pd.Series(_fillna0(_ewm(dx, period)), index=data.index)
     
     def _calculate_atr(self, data: pd.DataFrame, period: int = 14) -> pd.Series:
-        high, low, close = data['high'], data['low'], data['close']
-        tr = pd.concat([high - low, abs(high - close.shift()), abs(low - close.shift())], axis=1).max(axis=1)
-        return tr.ewm(span=period, adjust=False).mean().fillna(0)
+        tr = _true_range(data['high'].to_numpy(), data['low'].to_numpy(), data['close'].to_numpy())
+        return pd.Series(_fillna0(_ewm(tr, period)), index=data.index)
     
     def _calculate_bb_width(self, data: pd.DataFrame, period: int = 20) -> pd.Series:
         close = data['close']
         std = close.rolling(period).std()
         return (4 * std).fillna(0)
     
-    def _detect_breakout(self, data: pd.DataFrame, adx: pd.Series, bb_width: pd.Series) -> bool:
-        if len(data) < 20: return False
+    def _detect_breakout(self, close: np.ndarray, open_: np.ndarray, bb_width: np.ndarray) -> bool:
+        if len(close) < 20: return False
         
         # [REVISI V3] Breakout Detection Instant (Price Action First)
         # Tidak lagi bergantung pada ADX (lagging), tapi pada penetrasi harga & ekspansi BB
+        # Cukup window terakhir (20/10 bar), bukan rolling atas seluruh data
         
         # 1. Price Breakout (Close tembus BB Upper/Lower 2.0 SD)
-        period = 20
-        std = data['close'].rolling(period).std().iloc[-1]
-        ma = data['close'].rolling(period).mean().iloc[-1]
+        tail = close[-20:]
+        std = tail.std(ddof=1)
+        ma = tail.mean()
         upper = ma + (2.0 * std)
         lower = ma - (2.0 * std)
         
-        close_now = data['close'].iloc[-1]
+        close_now = close[-1]
         is_price_breakout = close_now > upper or close_now < lower
         
         # 2. Candle Impulse (Body candle gede banget)
-        open_now = data['open'].iloc[-1]
-        current_body = abs(close_now - open_now)
-        avg_body = abs(data['close'] - data['open']).rolling(10).mean().iloc[-1]
+        current_body = abs(close_now - open_[-1])
+        avg_body = np.abs(close[-10:] - open_[-10:]).mean()
         
         # Jika body candle sekarang 2x lipat rata-rata -> IMPULSE
         is_impulse_candle = current_body > (avg_body * 2.0)
         
         # 3. BB Expansion (Syarat sekunder)
-        avg_bbw = bb_width.rolling(10).mean().iloc[-1]
-        current_bbw = bb_width.iloc[-1]
+        avg_bbw = bb_width[-10:].mean()
+        current_bbw = bb_width[-1]
         is_bb_expanding = current_bbw > avg_bbw
         
         # Kesimpulan Breakout: Harga tembus BB DAN (Candle Gede ATAU BB Melebar)
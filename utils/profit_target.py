@@ -1,14 +1,206 @@
+import atexit
+import functools
 import json
-from datetime import datetime
+import queue
+import struct
+import textwrap
+import threading
+import time
 import os
-from typing import Tuple, Dict, Any
+from dataclasses import dataclass
+from typing import Tuple, Dict, Any, Optional
 from utils.settings_manager import SettingsManager
 
+try:
+    import orjson
+
+    def _dumps(data: Dict, pretty: bool = False) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(data: Dict, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(data, indent=2).encode('utf-8')
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+    _loads = json.loads
+
+# Format biner daily stats (fixed size): tanggal YYYYMMDD, profit, trades, target_reached, stopped_at
+_STATS_STRUCT = struct.Struct('<IdIB20s')
+
+
+def _pack_stats(data: Dict) -> bytes:
+    return _STATS_STRUCT.pack(
+        int(data['date'].replace('-', '')),
+        data['profit'],
+        data['trades'],
+        data['target_reached'],
+        (data['stopped_at'] or '').encode('utf-8')[:20],
+    )
+
+
+def _unpack_stats(buf: bytes) -> Dict:
+    date, profit, trades, reached, stopped = _STATS_STRUCT.unpack(buf)
+    date = str(date)
+    stopped = stopped.rstrip(b'\0').decode('utf-8')
+    return {
+        'date': f"{date[:4]}-{date[4:6]}-{date[6:]}",
+        'profit': profit,
+        'trades': trades,
+        'target_reached': bool(reached),
+        'stopped_at': stopped or None,
+    }
+
+
+# pwrite/fdatasync tidak ada di Windows -> fallback lseek+write / fsync
+if hasattr(os, 'pwrite'):
+    def _pwrite(fd: int, payload: bytes) -> None:
+        os.pwrite(fd, payload, 0)
+else:
+    def _pwrite(fd: int, payload: bytes) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, payload)
+
+_fdatasync = getattr(os, 'fdatasync', os.fsync)
+
+
+# Coalescing tulis daily stats: maksimal sekali per N trade / T detik
+STATS_FLUSH_INTERVAL_SEC = 2.0
+STATS_FLUSH_EVERY_N = 10
+
+# Progress bar lebar 10 untuk tiap jumlah blok terisi (0..10)
+_BAR_WIDTH = 10
+_BARS = tuple(f"[{'█' * i}{'░' * (_BAR_WIDTH - i)}]" for i in range(_BAR_WIDTH + 1))
+_BARS_LOSS = tuple(f"[{'▓' * i}{'░' * (_BAR_WIDTH - i)}]" for i in range(_BAR_WIDTH + 1))
+
+# Border kotak get_visual_progress
+_BORDER_TOP = "╔════════════════════════════════════════════╗"
+_BORDER_MID = "╠════════════════════════════════════════════╣"
+_BORDER_BOT = "╚════════════════════════════════════════════╝"
+_MSG_WRAP_WIDTH = 41
+
+# Template render get_visual_progress / get_summary_text; bagian yang bercabang
+# (sisa/excess, status, action) dipilih dulu lalu disisipkan lewat satu format_map
+_VISUAL_DISABLED = """
+╔════════════════════════════════════════════╗
+║      PROFIT TARGET: DISABLED ⏸️          ║
+╚════════════════════════════════════════════╝
+"""
+_VISUAL_TMPL = "\n".join((
+    _BORDER_TOP,
+    "║  {emoji}  DAILY PROFIT TARGET TRACKER        ║",
+    _BORDER_MID,
+    "║  Progress: {bar} {pct:.1f}%",
+    "║",
+    "║  💰 Current:  ${curr:+.2f}",
+    "║  🎯 Target:   ${tgt:.2f}",
+    "{delta}",
+    "║",
+    "║  📈 Trades Today: {trades}",
+    "║",
+    "{status}",
+    _BORDER_MID,
+    "{message}",
+    _BORDER_BOT,
+))
+_VISUAL_EXCESS = "║  ✨ Excess:   $%+.2f"
+_VISUAL_REMAINING = "║  📊 Remaining: $%.2f"
+_VISUAL_REACHED = {
+    'STOP': "║  ✅ STATUS: TARGET REACHED!\n║  🛑 Action: Trading STOPPED",
+    'REDUCE_LOT': "║  ✅ STATUS: TARGET REACHED!\n║  📉 Action: Lot reduced to %s%%",
+}
+_VISUAL_CONTINUE = "║  ✅ STATUS: TARGET REACHED!\n║  ▶️  Action: Continue trading"
+_VISUAL_LOSS = "║  ⚠️  STATUS: LOSS ($%.2f)"
+_VISUAL_ACTIVE = "║  🔄 STATUS: ACTIVE"
+
+_SUMMARY_TMPL = "\n".join((
+    "{emoji} DAILY PROFIT TARGET",
+    "=" * 45,
+    "{color} Target: {bar} {pct:.1f}% (${curr:+.2f} / ${tgt:.2f})",
+    "",
+    "💰 Current P/L:  ${curr:+.2f}",
+    "🎯 Target:       ${tgt:.2f}",
+    "{delta}",
+    "📈 Trades:       {trades}",
+    "",
+    "{status}",
+    "",
+    "💬 {message}",
+))
+_SUMMARY_EXCESS = "✨ Excess:       $%+.2f"
+_SUMMARY_REMAINING = "📊 Remaining:    $%.2f"
+_SUMMARY_REACHED = {
+    'STOP': "✅ TARGET REACHED!\n🛑 Trading STOPPED",
+    'REDUCE_LOT': "✅ TARGET REACHED!\n📉 Lot reduced to %s%%",
+}
+_SUMMARY_CONTINUE = "✅ TARGET REACHED!\n▶️  Continue trading"
+_SUMMARY_LOSS = "⚠️  LOSS: $%.2f"
+
+
+@functools.lru_cache(maxsize=64)
+def _wrap_message(msg: str) -> str:
+    """Baris pesan di dalam kotak visual (wrap hanya untuk pesan panjang, hasil di-cache)."""
+    if len(msg) <= 42:
+        return f"║  {msg}"
+    wrapped = textwrap.wrap(msg, _MSG_WRAP_WIDTH, break_long_words=False, break_on_hyphens=False)
+    return "\n".join(f"║  {w}" for w in wrapped)
+
+# Pesan motivasi per bucket 10% (index = percentage // 10, hanya untuk 0..99%)
+_MSG_LETS_GO = ('🎯', "🎯 Let's go! $%.2f to target!")
+_MSG_HALFWAY = ('🔥', "⚡ Halfway there! $%.2f more to target!")
+_MSG_BUCKETS = (
+    _MSG_LETS_GO, _MSG_LETS_GO, _MSG_LETS_GO, _MSG_LETS_GO, _MSG_LETS_GO,
+    _MSG_HALFWAY, _MSG_HALFWAY, _MSG_HALFWAY,
+    ('🔥', "💪 Almost there! Keep pushing! $%.2f to go!"),
+    ('🔥', "🔥 SO CLOSE! Only $%.2f to glory!"),
+)
+_MSG_SMASHED = "🎉 TARGET SMASHED! You're up $%.2f extra (+%.1f%% over target)!"
+_MSG_LOSS = "💪 Stay strong! Down $%.2f, trade smart to recover!"
+
+# Hasil can_trade()/get_lot_multiplier()/get_progress() saat fitur nonaktif (selalu sama)
+_DISABLED_OK = (True, "Profit target disabled")
+_DISABLED_MULT = 1.0
+_DISABLED_PROGRESS = {
+    'enabled': False,
+    'target': 0,
+    'current': 0,
+    'remaining': 0,
+    'progress_pct': 0,
+    'trades': 0,
+    'status': 'DISABLED',
+    'progress_bar': '[░░░░░░░░░░]',
+    'status_emoji': '⏸️',
+    'message': 'Profit target is disabled',
+    'percentage_of_target': 0.0
+}
+
+@dataclass
+class _Progress:
+    """Nilai progress (sudah dibulatkan untuk tampilan), dihitung sekali per panggilan."""
+    __slots__ = ('target', 'current', 'remaining', 'progress_pct', 'percentage_of_target', 'trades',
+                 'status', 'target_reached', 'action', 'bar', 'emoji', 'message')
+    target: float
+    current: float
+    remaining: float
+    progress_pct: float
+    percentage_of_target: float
+    trades: int
+    status: str
+    target_reached: bool
+    action: str
+    bar: str
+    emoji: str
+    message: str
+
+
 class ProfitTargetManager:
     def __init__(self, sm: SettingsManager):
         self.sm = sm
         self.settings = {}
-        self.stats_file = 'data/daily_stats.json'
+        self.stats_file = 'data/daily_stats.bin'
+        # Export JSON (manual reset / debugging) dan sumber migrasi dari format lama
+        self.stats_json_file = 'data/daily_stats.json'
         self.enabled = False
         self.daily_target_usd = 20.0
         self.action_when_reached = 'STOP'
@@ -20,11 +212,50 @@ class ProfitTargetManager:
         self.stopped_at = None
         
         self.last_checked_date = None
+        # Tanggal milik angka today_* di memori (bisa tertinggal dari _today() sampai reload hari baru)
+        self._stats_date = None
+        # Cache string tanggal hari ini, dihitung ulang hanya setelah lewat tengah malam
+        self._today_str = ''
+        self._day_end_ts = 0.0
+        self._stats_mtime_ns = 0
+        self._settings_mtime_ns = None
+
+        self._dirty = False
+        self._last_flush_ts = 0.0
+        self._flush_interval = STATS_FLUSH_INTERVAL_SEC
+        self._flush_every_n = STATS_FLUSH_EVERY_N
+        self._trades_since_flush = 0
+
+        # Penulisan file di thread terpisah; antrian 1 slot -> hanya snapshot terbaru yang ditulis
+        self._save_q = queue.Queue(maxsize=1)
+        self._save_seq = 0
+        self._written_seq = 0
+        self._io_lock = threading.Lock()
+        # Melindungi angka today_* + state flush (dipakai juga oleh tick thread penulis)
+        self._state_lock = threading.RLock()
+        self._fd = None
+        self._last_written_reached = False
+        self._closed = threading.Event()
+        os.makedirs('data', exist_ok=True)
+        self._open_stats_fd()
+        self._save_thr = threading.Thread(target=self._saver_loop, name='ProfitTargetSaver', daemon=True)
+        self._save_thr.start()
 
         self.load_settings()
         self.load_daily_stats()
+        atexit.register(self._shutdown)
+
+    def _settings_file_mtime(self):
+        try:
+            return os.stat(self.sm.settings_path).st_mtime_ns
+        except (AttributeError, OSError):
+            return None
 
     def load_settings(self) -> None:
+        # Lewati parse ulang jika file settings tidak berubah sejak load terakhir
+        mtime = self._settings_file_mtime()
+        if mtime is not None and mtime == self._settings_mtime_ns:
+            return
         try:
             self.settings = self.sm.load_settings()
             pt_config = self.settings.get('profit_target', {})
@@ -32,27 +263,61 @@ class ProfitTargetManager:
             self.daily_target_usd = float(pt_config.get('daily_target_usd', 20.0))
             self.action_when_reached = str(pt_config.get('action_when_reached', 'STOP')).upper()
             self.reduce_lot_pct = float(pt_config.get('reduce_lot_pct', 50.0))
+            self._settings_mtime_ns = mtime
 
         except Exception as e:
             print(f"[ProfitTarget] Error loading settings: {e}")
 
+    def _today(self) -> str:
+        now = time.time()
+        if now >= self._day_end_ts:
+            lt = time.localtime(now)
+            self._today_str = time.strftime('%Y-%m-%d', lt)
+            self._day_end_ts = time.mktime((lt.tm_year, lt.tm_mon, lt.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+        return self._today_str
+
     def load_daily_stats(self) -> None:
-        today_str = datetime.now().strftime('%Y-%m-%d')
+        today_str = self._today()
         
         if self.last_checked_date == today_str:
-            return
-
-        self.last_checked_date = today_str
+            # Hari sama: parse ulang hanya jika file diubah dari luar (mtime beda dari tulisan kita).
+            # Perubahan yang belum di-flush menang atas isi file.
+            try:
+                st = os.stat(self.stats_file)
+            except FileNotFoundError:
+                self._drain_saves()
+                if not os.path.exists(self.stats_file):
+                    self._create_stats_file()
+                return
+            if st.st_mtime_ns == self._stats_mtime_ns or self._dirty:
+                return
+        else:
+            self.last_checked_date = today_str
+            self._flush_if_dirty()
+            self._drain_saves()
         
         try:
-            if not os.path.exists(self.stats_file):
+            # File baru dari O_CREAT masih kosong sampai record pertama di-pwrite
+            try:
+                stats_size = os.path.getsize(self.stats_file)
+            except OSError:
+                stats_size = 0
+            if stats_size >= _STATS_STRUCT.size:
+                with self._io_lock, open(self.stats_file, 'rb') as f:
+                    data = _unpack_stats(f.read())
+                    self._stats_mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+            elif os.path.exists(self.stats_json_file):
+                # Migrasi sekali dari daily_stats.json lama
+                with open(self.stats_json_file, 'rb') as f:
+                    data = _loads(f.read())
+                self._stats_mtime_ns = 0
+                self._dirty = True
+            else:
                 self._create_stats_file()
                 return
 
-            with open(self.stats_file, 'r') as f:
-                data = json.load(f)
-
             if data.get('date') == today_str:
+                self._stats_date = today_str
                 self.today_profit = float(data.get('profit', 0.0))
                 self.today_trades = int(data.get('trades', 0))
                 self.target_reached = bool(data.get('target_reached', False))
@@ -64,61 +329,215 @@ class ProfitTargetManager:
             print(f"[ProfitTarget] Error loading daily stats: {e}")
             self._reset_daily_stats()
 
+    def _open_stats_fd(self) -> None:
+        """Buka file stats sekali; setiap save cukup pwrite record di offset 0 (ukuran tetap)."""
+        with self._io_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self._stats_fd()
+
+    def _stats_fd(self) -> int:
+        # Dipanggil di bawah _io_lock; buka lazy lagi kalau fd sudah ditutup _shutdown
+        if self._fd is None:
+            flags = os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+            try:
+                self._fd = os.open(self.stats_file, flags, 0o644)
+            except FileNotFoundError:
+                # Folder data/ dibuat di __init__; buat ulang hanya kalau dihapus dari luar
+                os.makedirs('data', exist_ok=True)
+                self._fd = os.open(self.stats_file, flags, 0o644)
+        return self._fd
+
     def _create_stats_file(self) -> None:
-        os.makedirs('data', exist_ok=True)
+        # File bisa terhapus dari luar -> fd lama menunjuk inode yatim, buka ulang
+        self._open_stats_fd()
         self._reset_daily_stats()
+        self._drain_saves()
 
-    def _reset_daily_stats(self) -> None:
+    def _reset_daily_stats(self, export_json: bool = False) -> None:
+        self._stats_date = self._today()
         self.today_profit = 0.0
         self.today_trades = 0
         self.target_reached = False
         self.stopped_at = None
-        self._save_stats()
-
-    def _save_stats(self) -> None:
-        try:
-            os.makedirs('data', exist_ok=True)
-            data = {
-                'date': datetime.now().strftime('%Y-%m-%d'),
+        self._save_stats(export_json=export_json)
+
+    def _save_stats(self, export_json: bool = False) -> None:
+        """Kirim snapshot ke thread penulis (non-blocking); snapshot lama yang belum tertulis dibuang."""
+        # Snapshot + seq di bawah _state_lock: add_trade_result (thread trading) dan tick
+        # thread penulis tidak boleh menghasilkan dua snapshot dengan seq sama
+        with self._state_lock:
+            self._dirty = False
+            self._save_seq += 1
+            item = (self._save_seq, {
+                # Tanggal saat angka dikumpulkan, bukan _today(): flush setelah tengah malam
+                # tidak boleh mencatat trade kemarin sebagai milik hari baru
+                'date': self._stats_date or self._today(),
                 'profit': round(self.today_profit, 2),
-                'trades': int(self.today_trades),
-                'target_reached': bool(self.target_reached),
+                # Sudah bertipe benar sejak masuk (load_daily_stats / add_trade_result / reset)
+                'trades': self.today_trades,
+                'target_reached': self.target_reached,
                 'stopped_at': self.stopped_at
-            }
-            with open(self.stats_file, 'w') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            print(f"[ProfitTarget] Error saving daily stats: {e}")
+            }, export_json)
+            while True:
+                try:
+                    self._save_q.put_nowait(item)
+                    break
+                except queue.Full:
+                    try:
+                        dropped = self._save_q.get_nowait()
+                    except queue.Empty:
+                        continue
+                    if dropped is not None and dropped[2] and not item[2]:
+                        # Export JSON dari snapshot yang dibuang tetap harus terjadi
+                        item = (item[0], item[1], True)
+            self._trades_since_flush = 0
+            self._last_flush_ts = time.monotonic()
+
+    @staticmethod
+    def _atomic_write(path: str, payload: bytes) -> int:
+        """Tulis ke .tmp lalu rename atomik -> file tidak pernah setengah tertulis. Return mtime_ns."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+        os.replace(tmp_path, path)
+        return mtime_ns
+
+    def _write_stats(self, seq: int, data: Dict, export_json: bool) -> None:
+        with self._io_lock:
+            if seq <= self._written_seq:
+                return
+            try:
+                fd = self._stats_fd()
+                _pwrite(fd, _pack_stats(data))
+                # fdatasync hanya saat status target berubah (bukan tiap trade)
+                if data['target_reached'] != self._last_written_reached:
+                    _fdatasync(fd)
+                    self._last_written_reached = data['target_reached']
+                self._stats_mtime_ns = os.fstat(fd).st_mtime_ns
+                if export_json:
+                    payload = _dumps(data, pretty=True)
+                    try:
+                        self._atomic_write(self.stats_json_file, payload)
+                    except FileNotFoundError:
+                        os.makedirs('data', exist_ok=True)
+                        self._atomic_write(self.stats_json_file, payload)
+                self._written_seq = seq
+            except Exception as e:
+                print(f"[ProfitTarget] Error saving daily stats: {e}")
+
+    def _saver_loop(self) -> None:
+        while not self._closed.is_set():
+            try:
+                item = self._save_q.get(timeout=self._flush_interval)
+            except queue.Empty:
+                # Tick periodik: trade yang tertahan dirty (tidak ada trade susulan) tetap
+                # tertulis paling lambat ~T detik kemudian
+                self._flush_if_dirty()
+                continue
+            if item is not None:
+                self._write_stats(*item)
+
+    def _drain_saves(self) -> None:
+        """Tulis snapshot yang masih antri secara sinkron (sebelum baca file / saat exit)."""
+        try:
+            item = self._save_q.get_nowait()
+        except queue.Empty:
+            return
+        if item is not None:
+            self._write_stats(*item)
+
+    def _flush_if_dirty(self) -> None:
+        with self._state_lock:
+            if self._dirty:
+                self._save_stats()
+
+    def _shutdown(self, timeout: float = 2.0) -> None:
+        self._flush_if_dirty()
+        self._drain_saves()
+        # Tunggu tulisan yang sedang dikerjakan thread penulis
+        deadline = time.monotonic() + timeout
+        while self._written_seq < self._save_seq and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with self._io_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Flush, tutup fd, dan hentikan thread penulis (untuk instance berumur pendek, mis. menu)."""
+        if self._closed.is_set():
+            return
+        self._shutdown(timeout)
+        self._closed.set()
+        try:
+            # Bangunkan thread penulis supaya tidak menunggu tick berikutnya
+            self._save_q.put_nowait(None)
+        except queue.Full:
+            pass
+        self._save_thr.join(timeout=self._flush_interval + timeout)
+        atexit.unregister(self._shutdown)
 
     def add_trade_result(self, profit: float) -> Tuple[bool, str]:
         if not self.enabled:
-            return True, "Profit target disabled"
+            return _DISABLED_OK
 
-        try:
-            self.today_profit += float(profit)
-        except Exception:
-            pass
-        self.today_trades += 1
-        self._save_stats()
-
-        if not self.target_reached and self.today_profit >= self.daily_target_usd:
-            self.target_reached = True
-            self.stopped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            self._save_stats()
-
-            if self.action_when_reached == 'STOP':
-                return False, f"🎯 Daily target reached! (${self.today_profit:.2f} / ${self.daily_target_usd:.2f})"
-            elif self.action_when_reached == 'REDUCE_LOT':
-                return True, f"🎯 Target reached! Reducing lot size to {self.reduce_lot_pct}%"
-            else:
-                return True, "🎯 Target reached! Continue trading."
+        with self._state_lock:
+            try:
+                self.today_profit += float(profit)
+            except Exception:
+                pass
+            self.today_trades += 1
+
+            # Tandai dirty, tulis ke disk hanya tiap N trade / T detik (target tercapai -> langsung)
+            self._dirty = True
+            self._trades_since_flush += 1
+            if (self._trades_since_flush >= self._flush_every_n
+                    or time.monotonic() - self._last_flush_ts > self._flush_interval):
+                self._save_stats()
+
+            if not self.target_reached and self.today_profit >= self.daily_target_usd:
+                self.target_reached = True
+                self.stopped_at = time.strftime('%Y-%m-%d %H:%M:%S')
+                self._save_stats()
+
+                if self.action_when_reached == 'STOP':
+                    return False, f"🎯 Daily target reached! (${self.today_profit:.2f} / ${self.daily_target_usd:.2f})"
+                elif self.action_when_reached == 'REDUCE_LOT':
+                    return True, f"🎯 Target reached! Reducing lot size to {self.reduce_lot_pct}%"
+                else:
+                    return True, "🎯 Target reached! Continue trading."
+
+            return True, "Trading continues"
+
+    # --- Fast path: saat nonaktif, can_trade/get_lot_multiplier/get_progress di-bind ulang
+    # per instance ke versi disabled (tanpa cek flag tiap panggilan). Lihat _bind_fast_paths.
+    
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        self._enabled = value
+        self._bind_fast_paths()
+
+    def _bind_fast_paths(self) -> None:
+        if self._enabled:
+            for name in ('can_trade', 'get_lot_multiplier', 'get_progress'):
+                self.__dict__.pop(name, None)
+        else:
+            self.can_trade = lambda: _DISABLED_OK
+            self.get_lot_multiplier = lambda: _DISABLED_MULT
+            self.get_progress = self._get_progress_disabled
 
-        return True, "Trading continues"
+    def _get_progress_disabled(self) -> Dict[str, Any]:
+        return _DISABLED_PROGRESS.copy()
 
     def can_trade(self) -> Tuple[bool, str]:
-        if not self.enabled:
-            return True, "Profit target disabled"
-        
         self.load_daily_stats()
 
         if self.target_reached and self.action_when_reached == 'STOP':
@@ -127,9 +546,6 @@ class ProfitTargetManager:
         return True, "OK"
 
     def get_lot_multiplier(self) -> float:
-        if not self.enabled:
-            return 1.0
-        
         self.load_daily_stats()
 
         if self.target_reached and self.action_when_reached == 'REDUCE_LOT':
@@ -140,185 +556,133 @@ class ProfitTargetManager:
 
         return 1.0
 
-    def _generate_progress_bar(self, percentage: float, width: int = 10) -> str:
+    def _generate_progress_bar(self, percentage: float, width: int = _BAR_WIDTH) -> str:
         percentage = max(0.0, min(100.0, percentage))
         filled = int((percentage / 100.0) * width)
         
-        if self.today_profit < 0:
-            fill_char = '▓' 
-            empty_char = '░'
-        elif percentage >= 100:
-            fill_char = '█' 
-            empty_char = '░'
-        else:
-            fill_char = '█' 
-            empty_char = '░'
+        if width == _BAR_WIDTH:
+            return (_BARS_LOSS if self.today_profit < 0 else _BARS)[filled]
         
-        bar = fill_char * filled + empty_char * (width - filled)
-        return f"[{bar}]"
-
-    def _get_status_emoji(self, percentage: float) -> str:
-        if self.today_profit < 0:
-            return '💀'
-        elif self.target_reached and self.action_when_reached == 'STOP':
-            return '⏸️'
-        elif percentage >= 100:
-            return '🏆'
-        elif percentage >= 50:
-            return '🔥'
-        else:
-            return '🎯'
-
-    def _get_motivational_message(self, percentage: float) -> str:
-        remaining = self.daily_target_usd - self.today_profit
+        fill_char = '▓' if self.today_profit < 0 else '█'
+        return f"[{fill_char * filled}{'░' * (width - filled)}]"
+
+    def _display(self, percentage: float) -> Tuple[str, str, str]:
+        """(progress_bar, status_emoji, message) dalam satu rantai kondisi."""
+        profit = self.today_profit
+        target = self.daily_target_usd
+        bar = self._generate_progress_bar(percentage)
+        
+        if profit < 0:
+            return bar, '💀', _MSG_LOSS % -profit
         
-        if self.today_profit < 0:
-            return f"💪 Stay strong! Down ${abs(self.today_profit):.2f}, trade smart to recover!"
-        elif percentage >= 100:
-            excess = self.today_profit - self.daily_target_usd
-            pct_over = ((self.today_profit / self.daily_target_usd) - 1) * 100 if self.daily_target_usd > 0 else 0
-            return f"🎉 TARGET SMASHED! You're up ${excess:.2f} extra (+{pct_over:.1f}% over target)!"
-        elif percentage >= 90:
-            return f"🔥 SO CLOSE! Only ${remaining:.2f} to glory!"
-        elif percentage >= 80:
-            return f"💪 Almost there! Keep pushing! ${remaining:.2f} to go!"
-        elif percentage >= 50:
-            return f"⚡ Halfway there! ${remaining:.2f} more to target!"
+        if percentage >= 100:
+            emoji = '🏆'
+            pct_over = ((profit / target) - 1) * 100 if target > 0 else 0
+            message = _MSG_SMASHED % (profit - target, pct_over)
         else:
-            return f"🎯 Let's go! ${remaining:.2f} to target!"
-
-    def get_progress(self) -> Dict[str, Any]:
-        self.load_daily_stats()
+            # percentage NaN (profit korup) jatuh ke bucket pertama seperti rantai if/elif lama
+            emoji, template = _MSG_BUCKETS[int(percentage // 10)] if percentage >= 0 else _MSG_LETS_GO
+            message = template % (target - profit)
         
+        if self.target_reached and self.action_when_reached == 'STOP':
+            emoji = '⏸️'
+        return bar, emoji, message
+
+    def _compute_progress(self) -> Optional[_Progress]:
+        """None jika fitur nonaktif."""
         if not self.enabled:
-            return {
-                'enabled': False,
-                'target': 0,
-                'current': 0,
-                'remaining': 0,
-                'progress_pct': 0,
-                'trades': 0,
-                'status': 'DISABLED',
-                'progress_bar': '[░░░░░░░░░░]',
-                'status_emoji': '⏸️',
-                'message': 'Profit target is disabled',
-                'percentage_of_target': 0.0
-            }
-
-        remaining = self.daily_target_usd - self.today_profit
-        progress_pct = (self.today_profit / self.daily_target_usd * 100.0) if self.daily_target_usd > 0 else 0.0
-        percentage_of_target = progress_pct 
+            return None
+        
+        self.load_daily_stats()
+
+        profit = self.today_profit
+        target = self.daily_target_usd
+        remaining = target - profit
+        progress_pct = (profit / target * 100.0) if target > 0 else 0.0
+
+        bar, emoji, message = self._display(progress_pct)
 
         if self.target_reached:
             status = 'TARGET_REACHED'
-        elif self.today_profit < 0:
+        elif profit < 0:
             status = 'LOSS'
-        elif self.today_profit > 0:
+        elif profit > 0:
             status = 'PROFIT'
         else:
             status = 'NEUTRAL'
 
+        return _Progress(
+            target=round(target, 2),
+            current=round(profit, 2),
+            remaining=round(max(0.0, remaining), 2),
+            progress_pct=round(min(100.0, max(0.0, progress_pct)), 1),
+            percentage_of_target=round(progress_pct, 1),
+            trades=int(self.today_trades),
+            status=status,
+            target_reached=bool(self.target_reached),
+            action=self.action_when_reached,
+            bar=bar,
+            emoji=emoji,
+            message=message,
+        )
+
+    def get_progress(self) -> Dict[str, Any]:
+        p = self._compute_progress()
+        if p is None:
+            return self._get_progress_disabled()
+
         return {
             'enabled': True,
-            'target': round(self.daily_target_usd, 2),
-            'current': round(self.today_profit, 2),
-            'remaining': round(max(0.0, remaining), 2),
-            'progress_pct': round(min(100.0, max(0.0, progress_pct)), 1),
-            'trades': int(self.today_trades),
-            'status': status,
-            'target_reached': bool(self.target_reached),
-            'action': self.action_when_reached,
-            'progress_bar': self._generate_progress_bar(progress_pct),
-            'status_emoji': self._get_status_emoji(progress_pct),
-            'message': self._get_motivational_message(progress_pct),
-            'percentage_of_target': round(percentage_of_target, 1)
+            'target': p.target,
+            'current': p.current,
+            'remaining': p.remaining,
+            'progress_pct': p.progress_pct,
+            'trades': p.trades,
+            'status': p.status,
+            'target_reached': p.target_reached,
+            'action': p.action,
+            'progress_bar': p.bar,
+            'status_emoji': p.emoji,
+            'message': p.message,
+            'percentage_of_target': p.percentage_of_target
         }
 
     def get_visual_progress(self) -> str:
-        progress = self.get_progress()
-        
-        if not progress['enabled']:
-            return """
-╔════════════════════════════════════════════╗
-║      PROFIT TARGET: DISABLED ⏸️          ║
-╚════════════════════════════════════════════╝
-"""
-
-        lines = []
-        lines.append("╔════════════════════════════════════════════╗")
-        lines.append(f"║  {progress['status_emoji']}  DAILY PROFIT TARGET TRACKER        ║")
-        lines.append("╠════════════════════════════════════════════╣")
-        
-        bar = progress['progress_bar']
-        pct = progress['percentage_of_target']
-        lines.append(f"║  Progress: {bar} {pct:.1f}%")
-        lines.append("║")
-        
-        curr = progress['current']
-        tgt = progress['target']
-        lines.append(f"║  💰 Current:  ${curr:+.2f}")
-        lines.append(f"║  🎯 Target:   ${tgt:.2f}")
+        progress = self._compute_progress()
         
-        if progress['target_reached']:
-            excess = curr - tgt
-            lines.append(f"║  ✨ Excess:   ${excess:+.2f}")
+        if progress is None:
+            return _VISUAL_DISABLED
+
+        curr = progress.current
+        if progress.target_reached:
+            delta = _VISUAL_EXCESS % (curr - progress.target)
+            status = _VISUAL_REACHED.get(progress.action, _VISUAL_CONTINUE)
+            if progress.action == 'REDUCE_LOT':
+                status = status % self.reduce_lot_pct
         else:
-            lines.append(f"║  📊 Remaining: ${progress['remaining']:.2f}")
-        
-        lines.append("║")
-        lines.append(f"║  📈 Trades Today: {progress['trades']}")
-        lines.append("║")
-        
-        if progress['target_reached']:
-            lines.append(f"║  ✅ STATUS: TARGET REACHED!")
-            if progress['action'] == 'STOP':
-                lines.append(f"║  🛑 Action: Trading STOPPED")
-            elif progress['action'] == 'REDUCE_LOT':
-                lines.append(f"║  📉 Action: Lot reduced to {self.reduce_lot_pct}%")
-            else:
-                lines.append(f"║  ▶️  Action: Continue trading")
-        elif curr < 0:
-            lines.append(f"║  ⚠️  STATUS: LOSS (${abs(curr):.2f})")
-        else:
-            lines.append(f"║  🔄 STATUS: ACTIVE")
-        
-        lines.append("╠════════════════════════════════════════════╣")
-        
-        msg = progress['message']
-        if len(msg) <= 42:
-            lines.append(f"║  {msg}")
-        else:
-            words = msg.split()
-            line = "║  "
-            for word in words:
-                if len(line + word) <= 44:
-                    line += word + " "
-                else:
-                    lines.append(line.rstrip())
-                    line = "║  " + word + " "
-            if line.strip() != "║":
-                lines.append(line.rstrip())
-        
-        lines.append("╚════════════════════════════════════════════╝")
-        
-        return "\n".join(lines)
+            delta = _VISUAL_REMAINING % progress.remaining
+            status = _VISUAL_LOSS % -curr if curr < 0 else _VISUAL_ACTIVE
+
+        return _VISUAL_TMPL.format_map({
+            'emoji': progress.emoji,
+            'bar': progress.bar,
+            'pct': progress.percentage_of_target,
+            'curr': curr,
+            'tgt': progress.target,
+            'delta': delta,
+            'trades': progress.trades,
+            'status': status,
+            'message': _wrap_message(progress.message),
+        })
 
     def get_summary_text(self) -> str:
-        progress = self.get_progress()
+        progress = self._compute_progress()
         
-        if not progress['enabled']:
+        if progress is None:
             return "Profit Target: DISABLED ⏸️"
 
-        lines = []
-        
-        emoji = progress['status_emoji']
-        lines.append(f"{emoji} DAILY PROFIT TARGET")
-        lines.append("=" * 45)
-        
-        bar = progress['progress_bar']
-        curr = progress['current']
-        tgt = progress['target']
-        pct = progress['percentage_of_target']
+        curr = progress.current
+        pct = progress.percentage_of_target
         
         if curr < 0:
             color_indicator = "🔴"
@@ -329,41 +693,30 @@ class ProfitTargetManager:
         else:
             color_indicator = "⚪"
         
-        lines.append(f"{color_indicator} Target: {bar} {pct:.1f}% (${curr:+.2f} / ${tgt:.2f})")
-        lines.append("")
-        
-        lines.append(f"💰 Current P/L:  ${curr:+.2f}")
-        lines.append(f"🎯 Target:       ${tgt:.2f}")
-        
-        if progress['target_reached']:
-            excess = curr - tgt
-            lines.append(f"✨ Excess:       ${excess:+.2f}")
+        if progress.target_reached:
+            delta = _SUMMARY_EXCESS % (curr - progress.target)
+            status = _SUMMARY_REACHED.get(progress.action, _SUMMARY_CONTINUE)
+            if progress.action == 'REDUCE_LOT':
+                status = status % self.reduce_lot_pct
         else:
-            lines.append(f"📊 Remaining:    ${progress['remaining']:.2f}")
-        
-        lines.append(f"📈 Trades:       {progress['trades']}")
-        lines.append("")
-        
-        if progress['target_reached']:
-            lines.append("✅ TARGET REACHED!")
-            if progress['action'] == 'STOP':
-                lines.append("🛑 Trading STOPPED")
-            elif progress['action'] == 'REDUCE_LOT':
-                lines.append(f"📉 Lot reduced to {self.reduce_lot_pct}%")
-            else:
-                lines.append("▶️  Continue trading")
-        elif curr < 0:
-            lines.append(f"⚠️  LOSS: ${abs(curr):.2f}")
-        else:
-            lines.append("🔄 ACTIVE")
-        
-        lines.append("")
-        lines.append(f"💬 {progress['message']}")
-        
-        return "\n".join(lines)
+            delta = _SUMMARY_REMAINING % progress.remaining
+            status = _SUMMARY_LOSS % -curr if curr < 0 else "🔄 ACTIVE"
+
+        return _SUMMARY_TMPL.format_map({
+            'emoji': progress.emoji,
+            'color': color_indicator,
+            'bar': progress.bar,
+            'pct': pct,
+            'curr': curr,
+            'tgt': progress.target,
+            'delta': delta,
+            'trades': progress.trades,
+            'status': status,
+            'message': progress.message,
+        })
 
     def manual_reset(self) -> bool:
-        self._reset_daily_stats()
+        self._reset_daily_stats(export_json=True)
         return True
 
     def update_target(self, new_target: float) -> Tuple[bool, str]:
@@ -375,6 +728,7 @@ class ProfitTargetManager:
             success = self.sm.update_setting('profit_target.daily_target_usd', new_target)
             if success:
                 self.daily_target_usd = new_target
+                self._settings_mtime_ns = self._settings_file_mtime()
                 return True, f"Target updated to ${new_target:.2f}"
             else:
                 return False, "Failed to write to settings file"
@@ -392,6 +746,7 @@ class ProfitTargetManager:
             success = self.sm.update_setting('profit_target.action_when_reached', action_up)
             if success:
                 self.action_when_reached = action_up
+                self._settings_mtime_ns = self._settings_file_mtime()
                 return True, f"Action updated to {action_up}"
             else:
                 return False, "Failed to write to settings file"
@@ -407,6 +762,7 @@ class ProfitTargetManager:
             success = self.sm.update_setting('profit_target.enabled', new_status)
             if success:
                 self.enabled = new_status
+                self._settings_mtime_ns = self._settings_file_mtime()
                 return True, f"Profit target {'ENABLED' if self.enabled else 'DISABLED'}"
             else:
                 return False, "Failed to write to settings file"
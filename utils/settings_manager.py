@@ -1,10 +1,15 @@
+import atexit
 import json
 import os
 import shutil
 import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Tuple, Dict, List, Any, Optional
+from typing import Tuple, Dict, List, Any, Optional, Callable
 from copy import deepcopy
+from utils._timefmt import now_str
 
 # --- CONSTANTS ---
 KEY_TRADING = 'trading'
@@ -19,129 +24,276 @@ KEY_META = '_meta'
 
 CURRENT_CONFIG_VERSION = 1
 
+# Encode/decode JSON: orjson jika terpasang (C, langsung bytes), fallback ke json stdlib
+try:
+    import orjson
+
+    def _dumps(data: Dict) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(data: Dict) -> bytes:
+        return json.dumps(data, indent=2).encode('utf-8')
+
+    _loads = json.loads
+
+
+def _clone(obj: Any) -> Any:
+    """Salin struktur JSON (dict/list/skalar) - jauh lebih murah dari deepcopy untuk config."""
+    if isinstance(obj, dict):
+        return {k: _clone(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_clone(v) for v in obj]
+    return obj
+
+
+# Skema default terpusat, dibangun sekali saat import (tanpa _meta - lihat _fresh_meta).
+# Jangan dimutasi: salin dengan _clone() sebelum dimasukkan ke config.
+_DEFAULTS_TEMPLATE: Dict[str, Any] = {
+    KEY_TRADING: {
+        'symbol': 'XAUUSD',
+        'timeframe': 'M5',
+        'default_lot': 0.01,
+        'max_positions': 5,
+        'max_positions_per_direction': 3,
+        # Trading style profile:
+        # SCALPING -> fokus TF cepat (M5)
+        # SWING    -> fokus TF besar (H1/H4)
+        # AUTO     -> pakai aturan dari config apa adanya
+        'trading_style': 'SCALPING'
+    },
+    KEY_RISK: {
+        'max_total_risk_pct': 5.0,
+        'risk_per_trade_pct': 1.0,
+        'max_single_position_risk_pct': 2.0,
+        'min_risk_reward_ratio': 1.5,
+        'atr_multiplier_sl': 1.5,
+        'atr_multiplier_tp': 2.5,
+        'breakeven_rr': 1.0,
+        'scale_out_enabled': True,
+        'scale_out_rr1': 1.5,
+        'scale_out_pct1': 0.5,
+        'trailing_stop_enabled': True,
+        'trailing_stop_atr_multiplier': 2.0,
+        'trailing_step_points': 50,
+        'trailing_activation_rr': 1.0,
+        'drawdown_risk_reduction': True,
+        'enable_margin_filter': True,
+        'min_margin_level_pct': 500.0,
+        'daily_loss_limit_pct': 5.0
+    },
+    KEY_SIGNALS: {
+        'strategy_mode_override': 'AUTO',
+        'higher_timeframe': 'H1',
+        'enable_mtf': True,
+        'use_ai': False,
+        'min_conf_sniper': 2.0,
+        'min_conf_trend': 1.5,
+        'min_conf_pullback': 2.0,
+        'min_conf_breakout': 1.2,
+        'min_exit_score': 2.0,
+        'cooldown_bars': 1,
+        'one_order_per_bar': True,
+        'scoring': {
+            'sniper_setup_score': 1.5, 'sniper_confirm_score': 1.0,
+            'trend_ma_score': 1.5, 'trend_macd_score': 1.0,
+            'pullback_trend_score': 1.8, 'pullback_rsi_score': 1.2,
+            'breakout_signal_score': 1.8, 'breakout_confirm_score': 1.2,
+            'mtf_bonus_score': 2.0, 'mtf_penalty_pct': 0.5
+        }
+    },
+    KEY_INDICATORS: {
+        'ma_period': 50, 'ma_shift': 0, 'ma_long_period': 200,
+        'rsi_period': 14, 'rsi_overbought': 70, 'rsi_oversold': 30,
+        'bb_period': 20, 'bb_deviation': 2.0,
+        'atr_period': 14,
+        'stoch_k_period': 14, 'stoch_d_period': 3, 'stoch_slowing': 3,
+        'stoch_overbought': 80, 'stoch_oversold': 20,
+        'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9
+    },
+    KEY_REGIME: {
+        'adx_trending': 25.0,
+        'adx_ranging': 20.0,
+        'atr_volatile_ratio': 1.5,
+        'bbw_ranging_pct': 0.05,
+        'breakout_momentum_pct': {'default': 0.005, 'XAUUSD': 0.003}
+    },
+    KEY_FILTERS: {
+        'news_filter_enabled': True,
+        'news_before_minutes': 30,
+        'news_after_minutes': 30,
+        'session_filter_enabled': True,
+        'min_atr_value': 0.2,
+        'allowed_sessions': ['asian', 'london', 'us'],
+        'spread_settings': {'default_max': 35, 'overrides': {'XAUUSD': 50}},
+        'asia_session_mode': 'DEFENSIVE'
+    },
+    KEY_BACKTEST: {
+        'start_date': None,
+        'end_date': None,
+        'initial_balance': 1000.0
+    },
+    KEY_DEBUG: {
+        'log_lot_calculation': False,
+        'log_mtf_filter': False,
+        'log_regime_changes': True
+    }
+}
+
+_DEFAULT_KEYSETS: Dict[str, frozenset] = {
+    key: frozenset(val) for key, val in _DEFAULTS_TEMPLATE.items() if isinstance(val, dict)
+}
+
+# Aturan validasi input setter: key -> fungsi (key yang tidak terdaftar selalu valid)
+_TIMEFRAMES = frozenset({'M1', 'M5', 'M15', 'M30', 'H1', 'H4', 'D1'})
+_ASIA_MODES = frozenset({'DEFENSIVE', 'AGGRESSIVE'})
+_TRADING_STYLES = frozenset({'SCALPING', 'SWING', 'AUTO'})
+
+_VALIDATORS: Dict[str, Callable[[Any], bool]] = {
+    'risk_per_trade_pct': lambda v: 0.1 <= float(v) <= 100.0,
+    'max_total_risk_pct': lambda v: 1.0 <= float(v) <= 100.0,
+    'default_lot': lambda v: float(v) >= 0.0,
+    'timeframe': lambda v: str(v).upper() in _TIMEFRAMES,
+    'max_positions': lambda v: 1 <= int(v) <= 20,
+    'max_spread': lambda v: 0 <= int(v) <= 500,
+    'asia_session_mode': lambda v: str(v).upper() in _ASIA_MODES,
+    'trading_style': lambda v: str(v).upper() in _TRADING_STYLES,
+}
+
+# Template get_summary; baris opsional (preset, warnings) diisi string kosong kalau tidak ada
+_SUMMARY_BAR = "=" * 60
+_SUMMARY_TEMPLATE = "\n".join((
+    _SUMMARY_BAR,
+    "              CURRENT CONFIGURATION".center(60),
+    _SUMMARY_BAR,
+    " {emoji} Health: {status}{preset}",
+    "",
+    " 📊 TRADING:",
+    " Symbol:        {symbol}",
+    " Timeframe:     {timeframe}",
+    " Mode:          {mode}",
+    " Style:         {style}",
+    "",
+    " 💰 RISK:",
+    " Per Trade:     {risk_pct}% (~${risk_usd:.2f})",
+    " Max Total:     {max_risk}% (~${max_usd:.2f})",
+    "",
+    " 🛡️ FILTERS:",
+    " News Filter:   {news}",
+    " MTF Filter:    {mtf}{warnings}",
+    _SUMMARY_BAR,
+))
+
+
+def _fresh_meta() -> Dict[str, Any]:
+    return {'version': CURRENT_CONFIG_VERSION, 'last_updated': now_str()}
+
+
+def _unpickle_manager(cls, state: Dict[str, Any]) -> 'SettingsManager':
+    obj = object.__new__(cls)
+    obj.__dict__.update(state)
+    return obj
+
+
 class SettingsManager:
-    _instance = None
+    # Satu instance per file settings untuk seluruh proses (load/validate hanya sekali)
+    _instances: Dict[str, 'SettingsManager'] = {}
     _lock = threading.RLock()
 
+    def __new__(cls, settings_path='config/settings.json'):
+        key = os.path.abspath(settings_path)
+        with cls._lock:
+            inst = cls._instances.get(key)
+            if inst is None:
+                inst = super().__new__(cls)
+                inst._initialized = False
+                cls._instances[key] = inst
+            return inst
+
     def __init__(self, settings_path='config/settings.json'):
+        with self._lock:
+            if self._initialized:
+                return
+            self._setup(settings_path)
+            self._initialized = True
+
+    def _setup(self, settings_path: str):
         self.settings_path = settings_path
         self.backup_dir = 'config/backups'
         self.audit_file = 'config/audit.log'
         self.temp_path = f"{settings_path}.tmp"
 
         self._settings_cache: Dict[str, Any] = {}
+        # Salinan beku dari _settings_cache untuk load_settings(); dibuang setiap kali cache berubah
+        self._snapshot: Optional[Dict[str, Any]] = None
+        # Generasi cache: naik tiap perubahan, dipakai memo get_health_status/get_quick_stats
+        self._cache_gen = 0
+        self._health_memo: Optional[Tuple[int, Tuple[str, str, List[str]]]] = None
+        self._quick_stats_memo: Optional[Tuple[int, float, Dict[str, Any]]] = None
+        # Mode batch: setter hanya menandai dirty, tulis file sekali di akhir batch()
+        self._batch_depth = 0
+        self._dirty = False
+        # mtime_ns file settings saat isinya terakhir sama dengan cache (None = cache sudah berubah)
+        self._last_saved_mtime: Optional[int] = None
 
         os.makedirs(os.path.dirname(self.settings_path), exist_ok=True)
         os.makedirs(self.backup_dir, exist_ok=True)
 
+        # Audit log dibuka sekali (line-buffered: tiap entri langsung sampai ke OS tanpa fsync)
+        self._audit_fp = None
+        self._open_audit()
+
+        # Index backup (mtime, path, filename, is_auto): satu scandir di sini, lalu dirawat in-place
+        self._backup_index: List[Tuple[float, str, str, bool]] = []
+        self.refresh_backups()
+
+        self._load_and_validate()
+
+    def __reduce__(self):
+        # Pickle (mis. initargs ProcessPoolExecutor di run_sweep): handle audit log tidak ikut,
+        # dan unpickle tidak lewat __new__ supaya tidak menimpa singleton path default
+        state = self.__dict__.copy()
+        state['_audit_fp'] = None
+        return _unpickle_manager, (type(self), state)
+
+    def _open_audit(self):
+        try:
+            self._audit_fp = open(self.audit_file, 'a', buffering=1)
+            atexit.register(self._audit_fp.close)
+        except OSError as e:
+            print(f"Audit log failed: {e}")
+        return self._audit_fp
+
+    def reload(self):
+        """Baca ulang file settings dari disk (mis. setelah diedit manual)."""
         self._load_and_validate()
 
     def _get_defaults(self) -> Dict[str, Any]:
-        """Centralized Default Schema Definition."""
-        return {
-            KEY_META: {'version': CURRENT_CONFIG_VERSION, 'last_updated': str(datetime.now())},
-            KEY_TRADING: {
-                'symbol': 'XAUUSD',
-                'timeframe': 'M5',
-                'default_lot': 0.01,
-                'max_positions': 5,
-                'max_positions_per_direction': 3,
-                # Trading style profile:
-                # SCALPING -> fokus TF cepat (M5)
-                # SWING    -> fokus TF besar (H1/H4)
-                # AUTO     -> pakai aturan dari config apa adanya
-                'trading_style': 'SCALPING'
-            },
-            KEY_RISK: {
-                'max_total_risk_pct': 5.0,
-                'risk_per_trade_pct': 1.0,
-                'max_single_position_risk_pct': 2.0,
-                'min_risk_reward_ratio': 1.5,
-                'atr_multiplier_sl': 1.5,
-                'atr_multiplier_tp': 2.5,
-                'breakeven_rr': 1.0,
-                'scale_out_enabled': True,
-                'scale_out_rr1': 1.5,
-                'scale_out_pct1': 0.5,
-                'trailing_stop_enabled': True,
-                'trailing_stop_atr_multiplier': 2.0,
-                'trailing_step_points': 50,
-                'trailing_activation_rr': 1.0,
-                'drawdown_risk_reduction': True,
-                'enable_margin_filter': True,
-                'min_margin_level_pct': 500.0,
-                'daily_loss_limit_pct': 5.0
-            },
-            KEY_SIGNALS: {
-                'strategy_mode_override': 'AUTO',
-                'higher_timeframe': 'H1',
-                'enable_mtf': True,
-                'use_ai': False,
-                'min_conf_sniper': 2.0,
-                'min_conf_trend': 1.5,
-                'min_conf_pullback': 2.0,
-                'min_conf_breakout': 1.2,
-                'min_exit_score': 2.0,
-                'cooldown_bars': 1,
-                'one_order_per_bar': True,
-                'scoring': {
-                    'sniper_setup_score': 1.5, 'sniper_confirm_score': 1.0,
-                    'trend_ma_score': 1.5, 'trend_macd_score': 1.0,
-                    'pullback_trend_score': 1.8, 'pullback_rsi_score': 1.2,
-                    'breakout_signal_score': 1.8, 'breakout_confirm_score': 1.2,
-                    'mtf_bonus_score': 2.0, 'mtf_penalty_pct': 0.5
-                }
-            },
-            KEY_INDICATORS: {
-                'ma_period': 50, 'ma_shift': 0, 'ma_long_period': 200,
-                'rsi_period': 14, 'rsi_overbought': 70, 'rsi_oversold': 30,
-                'bb_period': 20, 'bb_deviation': 2.0,
-                'atr_period': 14,
-                'stoch_k_period': 14, 'stoch_d_period': 3, 'stoch_slowing': 3,
-                'stoch_overbought': 80, 'stoch_oversold': 20,
-                'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9
-            },
-            KEY_REGIME: {
-                'adx_trending': 25.0,
-                'adx_ranging': 20.0,
-                'atr_volatile_ratio': 1.5,
-                'bbw_ranging_pct': 0.05,
-                'breakout_momentum_pct': {'default': 0.005, 'XAUUSD': 0.003}
-            },
-            KEY_FILTERS: {
-                'news_filter_enabled': True,
-                'news_before_minutes': 30,
-                'news_after_minutes': 30,
-                'session_filter_enabled': True,
-                'min_atr_value': 0.2,
-                'allowed_sessions': ['asian', 'london', 'us'],
-                'spread_settings': {'default_max': 35, 'overrides': {'XAUUSD': 50}},
-                'asia_session_mode': 'DEFENSIVE'
-            },
-            KEY_BACKTEST: {
-                'start_date': None,
-                'end_date': None,
-                'initial_balance': 1000.0
-            },
-            KEY_DEBUG: {
-                'log_lot_calculation': False,
-                'log_mtf_filter': False,
-                'log_regime_changes': True
-            }
-        }
+        """Centralized Default Schema Definition (salinan baru dari _DEFAULTS_TEMPLATE)."""
+        defaults = {KEY_META: _fresh_meta()}
+        defaults.update(_clone(_DEFAULTS_TEMPLATE))
+        return defaults
 
     # --- AUDIT LOGGING ---
     def _log_audit(self, action: str, key: str, old_val: Any, new_val: Any):
         try:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            entry = f"[{timestamp}] {action.upper()} | Key: {key} | Old: {old_val} -> New: {new_val}\n"
-            with open(self.audit_file, 'a') as f:
-                f.write(entry)
+            entry = f"[{now_str()}] {action.upper()} | Key: {key} | Old: {old_val} -> New: {new_val}\n"
+            fp = self._audit_fp
+            if fp is None:
+                # Belum dibuka (objek hasil unpickle) -> buka sekali di sini
+                fp = self._open_audit()
+            if fp is not None and not fp.closed:
+                fp.write(entry)
+            else:
+                with open(self.audit_file, 'a') as f:
+                    f.write(entry)
         except Exception as e:
             print(f"Audit log failed: {e}")
 
     # --- MIGRATION & LOAD ---
-    def _migrate_schema(self, data: Dict) -> Dict:
+    def _migrate_schema(self, data: Dict) -> Tuple[Dict, bool]:
+        """Return (data, changed)."""
         meta = data.get(KEY_META, {})
         version = meta.get('version', 0)
 
@@ -150,72 +302,180 @@ class SettingsManager:
             if KEY_META not in data:
                 data[KEY_META] = {}
             data[KEY_META]['version'] = CURRENT_CONFIG_VERSION
-            data[KEY_META]['last_migration'] = str(datetime.now())
+            data[KEY_META]['last_migration'] = now_str()
+            return data, True
 
-        return data
+        return data, False
 
     def _load_and_validate(self):
         with self._lock:
             loaded = {}
+            # File baru/korup selalu ditulis; file valid hanya ditulis ulang kalau ada yang diubah
+            changed = False
             try:
                 if os.path.exists(self.settings_path) and os.path.getsize(self.settings_path) > 0:
-                    with open(self.settings_path, 'r') as f:
-                        loaded = json.load(f)
+                    with open(self.settings_path, 'rb') as f:
+                        loaded = _loads(f.read())
                 else:
                     loaded = self._get_defaults()
+                    changed = True
             except json.JSONDecodeError:
                 print("[Settings] ❌ CORRUPTED JSON! Attempting restore...")
                 if self._restore_last_working():
                     return self._load_and_validate()
                 else:
                     loaded = self._get_defaults()
+                    changed = True
 
-            loaded = self._migrate_schema(loaded)
-            self._settings_cache = self._validate_schema(loaded)
-            self.save_settings(log_audit=False)
+            # Fast path: versi sudah terkini -> tidak perlu masuk _migrate_schema
+            if loaded.get(KEY_META, {}).get('version') == CURRENT_CONFIG_VERSION:
+                migrated = False
+            else:
+                loaded, migrated = self._migrate_schema(loaded)
+            filled = self._fill_defaults(loaded)
+            self._settings_cache = loaded
+            self._invalidate()
+            clamped = self._validate_cross_fields()
+            if changed or migrated or filled or clamped:
+                self.save_settings(log_audit=False)
+            else:
+                self._last_saved_mtime = os.stat(self.settings_path).st_mtime_ns
+
+    def _fill_defaults(self, config: Dict) -> bool:
+        """Lengkapi key yang hilang dari template default. Return True jika ada yang ditambahkan."""
+        changed = False
+        meta = config.get(KEY_META)
+        if meta is None or 'version' not in meta or 'last_updated' not in meta:
+            changed = True
+            fresh = _fresh_meta()
+            if meta is None:
+                config[KEY_META] = fresh
+            else:
+                for sub_key, sub_val in fresh.items():
+                    if sub_key not in meta:
+                        meta[sub_key] = sub_val
 
-    def _validate_schema(self, config: Dict) -> Dict:
-        defaults = self._get_defaults()
-        for key, val in defaults.items():
+        # Template dibaca langsung; nilai yang disisipkan disalin supaya config tidak berbagi objek
+        for key, val in _DEFAULTS_TEMPLATE.items():
             if key not in config:
-                config[key] = val
+                config[key] = _clone(val)
+                changed = True
             elif isinstance(val, dict):
-                for sub_key, sub_val in val.items():
-                    if sub_key not in config[key]:
-                        config[key][sub_key] = sub_val
+                # Satu set-diff per section; isi yang hilang mengikuti urutan template
+                section = config[key]
+                missing = _DEFAULT_KEYSETS[key] - section.keys()
+                if missing:
+                    changed = True
+                    for sub_key, sub_val in val.items():
+                        if sub_key in missing:
+                            section[sub_key] = _clone(sub_val)
+        return changed
+
+    def _validate_schema(self, config: Dict) -> Dict:
+        self._fill_defaults(config)
         return config
 
+    def _invalidate(self):
+        """Buang snapshot & memo turunan setelah _settings_cache berubah."""
+        self._snapshot = None
+        self._cache_gen += 1
+
     def load_settings(self) -> Dict[str, Any]:
-        return deepcopy(self._settings_cache)
+        # Pemanggil boleh memodifikasi hasilnya (setdefault dsb.), jadi tetap kembalikan salinan;
+        # snapshot tidak pernah dimutasi sehingga bisa disalin tanpa menahan lock
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None:
+                    snapshot = self._snapshot = _clone(self._settings_cache)
+        return _clone(snapshot)
+
+    def overlay(self, settings: Dict[str, Any]) -> 'SettingsManager':
+        """
+        Salinan in-memory dengan settings pengganti (tanpa baca/tulis file).
+        Dipakai backtester supaya custom settings per-run tidak perlu
+        membuat SettingsManager baru dari disk.
+        """
+        # copy() akan lewat __new__ (singleton) -> buat objek langsung
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone._settings_cache = settings
+        clone._invalidate()
+        clone._last_saved_mtime = None
+        return clone
+
+    @contextmanager
+    def batch(self):
+        """
+        Gabungkan banyak perubahan jadi satu tulis file (satu fsync):
+            with sm.batch():
+                sm.set_symbol('XAUUSD'); sm.set_timeframe('M5')
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._dirty:
+                    self._dirty = False
+                    self.save_settings()
 
     def save_settings(self, log_audit=True) -> bool:
         with self._lock:
+            self._last_saved_mtime = None
             try:
-                self._validate_cross_fields()
-
-                if KEY_META not in self._settings_cache:
-                    self._settings_cache[KEY_META] = {}
-                self._settings_cache[KEY_META]['last_updated'] = str(datetime.now())
+                return self._write_settings()
+            finally:
+                # Semua jalur yang mengubah cache (setter, preset, restore) berakhir di sini;
+                # invalidate setelah clamp/last_updated supaya pembaca tanpa lock tidak memo nilai setengah jadi
+                self._invalidate()
+
+    def _write_settings(self) -> bool:
+        if self._batch_depth:
+            # last_updated & clamp dikerjakan sekali saat batch selesai, bukan per setter
+            self._dirty = True
+            return True
+        try:
+            self._validate_cross_fields()
 
-                with open(self.temp_path, 'w') as f:
-                    json.dump(self._settings_cache, f, indent=2)
-                    f.flush()
-                    os.fsync(f.fileno())
+            if KEY_META not in self._settings_cache:
+                self._settings_cache[KEY_META] = {}
+            self._settings_cache[KEY_META]['last_updated'] = now_str()
 
-                os.replace(self.temp_path, self.settings_path)
-                return True
-            except Exception as e:
-                print(f"[Settings] Save failed: {e}")
-                if os.path.exists(self.temp_path):
-                    os.remove(self.temp_path)
-                return False
+            payload = _dumps(self._settings_cache)
+            # Tanpa file object Python: open/write/fsync langsung di fd
+            fd = os.open(self.temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+            try:
+                view = memoryview(payload)
+                while view:
+                    view = view[os.write(fd, view):]
+                os.fsync(fd)
+                mtime_ns = os.fstat(fd).st_mtime_ns
+            finally:
+                os.close(fd)
+
+            os.replace(self.temp_path, self.settings_path)
+            self._last_saved_mtime = mtime_ns
+            return True
+        except Exception as e:
+            print(f"[Settings] Save failed: {e}")
+            if os.path.exists(self.temp_path):
+                os.remove(self.temp_path)
+            return False
 
-    def _validate_cross_fields(self):
+    def _validate_cross_fields(self) -> bool:
+        """Clamp risk per-trade/single-position ke max total. Return True jika ada yang diubah."""
+        changed = False
         rm = self._settings_cache.get(KEY_RISK, {})
         if rm.get('risk_per_trade_pct', 0) > rm.get('max_total_risk_pct', 100):
             rm['risk_per_trade_pct'] = rm['max_total_risk_pct']
+            changed = True
         if rm.get('max_single_position_risk_pct', 0) > rm.get('max_total_risk_pct', 100):
             rm['max_single_position_risk_pct'] = rm['max_total_risk_pct']
+            changed = True
+        return changed
 
     # --- PRESETS (Deep Merge) ---
 
@@ -257,11 +517,19 @@ class SettingsManager:
         }
 
     def _deep_update(self, base_dict: Dict, update_dict: Dict) -> Dict:
-        for key, value in update_dict.items():
-            if isinstance(value, dict) and key in base_dict and isinstance(base_dict[key], dict):
-                self._deep_update(base_dict[key], value)
-            else:
-                base_dict[key] = value
+        # Iteratif: per level, nilai daun diterapkan sekaligus lewat satu dict.update,
+        # pasangan dict-dalam-dict ditunda ke stack
+        stack = deque([(base_dict, update_dict)])
+        while stack:
+            base, upd = stack.pop()
+            leaves = {}
+            for key, value in upd.items():
+                if isinstance(value, dict) and isinstance(base.get(key), dict):
+                    stack.append((base[key], value))
+                else:
+                    leaves[key] = value
+            if leaves:
+                base.update(leaves)
         return base_dict
 
     def load_preset(self, preset_name: str) -> Tuple[bool, str]:
@@ -295,83 +563,111 @@ class SettingsManager:
     # --- BACKUP ---
 
     def backup_settings(self, auto=False) -> Tuple[bool, str]:
+        """Best-effort: backup sengaja tidak di-fsync (hanya file settings utama yang durable)."""
         with self._lock:
             try:
-                ts = datetime.now().strftime('%Y-%m-%d_%H%M%S')
+                ts = time.strftime('%Y-%m-%d_%H%M%S')
                 prefix = "auto_" if auto else ""
                 fname = f"{prefix}settings_backup_{ts}.json"
                 fpath = os.path.join(self.backup_dir, fname)
 
-                # Atomic Copy
+                # Atomic Copy: file settings di disk masih identik dengan cache -> salin saja, tanpa encode ulang
                 temp_backup = fpath + ".tmp"
-                with open(temp_backup, 'w') as f:
-                    json.dump(self._settings_cache, f, indent=2)
+                if self._settings_file_current():
+                    shutil.copyfile(self.settings_path, temp_backup)
+                else:
+                    with open(temp_backup, 'wb') as f:
+                        f.write(_dumps(self._settings_cache))
                 os.replace(temp_backup, fpath)
 
+                # Nama sama (backup di detik yang sama) menimpa file lama
+                self._backup_index = [b for b in self._backup_index if b[1] != fpath]
+                self._backup_index.append((os.stat(fpath).st_mtime, fpath, fname, auto))
                 self._cleanup_old_backups()
                 return True, fpath
             except Exception as e:
                 return False, str(e)
 
-    def _cleanup_old_backups(self):
-        try:
-            files = []
-            with os.scandir(self.backup_dir) as entries:
-                for entry in entries:
-                    if entry.is_file() and entry.name.endswith('.json'):
-                        files.append((entry.path, entry.stat().st_mtime))
-            files.sort(key=lambda x: x[1], reverse=True)
-            for fpath, _ in files[10:]:
-                try:
-                    os.remove(fpath)
-                except:
-                    pass
-        except:
-            pass
-
-    def list_backups(self) -> List[Dict[str, Any]]:
-        backups = []
+    def refresh_backups(self):
+        """Bangun ulang index backup dari disk (init, atau setelah file backup hilang dari luar)."""
+        index = []
         try:
             with os.scandir(self.backup_dir) as entries:
                 for entry in entries:
                     if entry.is_file() and entry.name.endswith('.json'):
                         try:
-                            ts = datetime.fromtimestamp(entry.stat().st_mtime)
-                            backups.append({
-                                'filename': entry.name,
-                                'path': entry.path,
-                                'timestamp': ts,
-                                'is_auto': 'auto_' in entry.name
-                            })
+                            index.append((entry.stat().st_mtime, entry.path, entry.name,
+                                          entry.name.startswith('auto_')))
                         except:
                             continue
-            backups.sort(key=lambda x: x['timestamp'], reverse=True)
         except:
             pass
-        return backups
+        self._backup_index = index
 
-    def _restore_last_working(self) -> bool:
-        backups = self.list_backups()
-        if not backups:
+    def _settings_file_current(self) -> bool:
+        if self._last_saved_mtime is None:
             return False
         try:
-            shutil.copy2(backups[0]['path'], self.settings_path)
-            return True
-        except:
+            return os.stat(self.settings_path).st_mtime_ns == self._last_saved_mtime
+        except OSError:
             return False
 
+    def _cleanup_old_backups(self):
+        self._backup_index.sort(key=lambda b: b[0], reverse=True)
+        for _, fpath, _, _ in self._backup_index[10:]:
+            try:
+                os.remove(fpath)
+            except:
+                pass
+        del self._backup_index[10:]
+
+    def list_backups(self) -> List[Dict[str, Any]]:
+        backups = sorted(self._backup_index, key=lambda b: b[0], reverse=True)
+        return [{
+            'filename': fname,
+            'path': fpath,
+            'timestamp': datetime.fromtimestamp(mtime),
+            'is_auto': is_auto
+        } for mtime, fpath, fname, is_auto in backups]
+
+    def _restore_last_working(self) -> bool:
+        # Backup tidak di-fsync, jadi bisa terpotong: pakai yang terbaru yang JSON-nya masih valid
+        for backup in self.list_backups():
+            try:
+                with open(backup['path'], 'rb') as f:
+                    payload = f.read()
+                _loads(payload)
+            except FileNotFoundError:
+                self.refresh_backups()
+                continue
+            except Exception:
+                print(f"[Settings] Skipping unreadable backup {backup['filename']}")
+                continue
+            try:
+                with open(self.temp_path, 'wb') as f:
+                    f.write(payload)
+                os.replace(self.temp_path, self.settings_path)
+                return True
+            except OSError:
+                return False
+        return False
+
     def restore_settings(self, backup_index: int) -> Tuple[bool, str]:
         with self._lock:
             backups = self.list_backups()
             if not (0 <= backup_index < len(backups)):
                 return False, "Invalid index"
             try:
-                with open(backups[backup_index]['path'], 'r') as f:
-                    data = json.load(f)
+                with open(backups[backup_index]['path'], 'rb') as f:
+                    data = _loads(f.read())
                 self._settings_cache = self._validate_schema(data)
                 self._log_audit("RESTORE", "Backup", "Current", backups[backup_index]['filename'])
                 self.save_settings()
                 return True, "Restored"
+            except FileNotFoundError as e:
+                # Backup dihapus dari luar -> index basi
+                self.refresh_backups()
+                return False, str(e)
             except Exception as e:
                 return False, str(e)
 
@@ -380,8 +676,8 @@ class SettingsManager:
         if not (0 <= backup_index < len(backups)):
             return "Invalid Index"
         try:
-            with open(backups[backup_index]['path'], 'r') as f:
-                backup_data = json.load(f)
+            with open(backups[backup_index]['path'], 'rb') as f:
+                backup_data = _loads(f.read())
             diffs = []
             for section in [KEY_RISK, KEY_TRADING, KEY_SIGNALS]:
                 curr = self._settings_cache.get(section, {})
@@ -397,24 +693,11 @@ class SettingsManager:
     # --- SETTERS ---
 
     def _validate_input(self, key: str, value: Any) -> bool:
-        try:
-            if key == 'risk_per_trade_pct':
-                return 0.1 <= float(value) <= 100.0
-            elif key == 'max_total_risk_pct':
-                return 1.0 <= float(value) <= 100.0
-            elif key == 'default_lot':
-                return float(value) >= 0.0
-            elif key == 'timeframe':
-                return str(value).upper() in ['M1', 'M5', 'M15', 'M30', 'H1', 'H4', 'D1']
-            elif key == 'max_positions':
-                return 1 <= int(value) <= 20
-            elif key == 'max_spread':
-                return 0 <= int(value) <= 500
-            elif key == 'asia_session_mode':
-                return str(value).upper() in ['DEFENSIVE', 'AGGRESSIVE']
-            elif key == 'trading_style':
-                return str(value).upper() in ['SCALPING', 'SWING', 'AUTO']
+        validator = _VALIDATORS.get(key)
+        if validator is None:
             return True
+        try:
+            return validator(value)
         except:
             return False
 
@@ -560,6 +843,13 @@ class SettingsManager:
 
     # --- HEALTH & STATS ---
     def get_health_status(self) -> Tuple[str, str, List[str]]:
+        memo = self._health_memo
+        if memo is None or memo[0] != self._cache_gen:
+            memo = self._health_memo = (self._cache_gen, self._compute_health_status())
+        emoji, status, warnings = memo[1]
+        return emoji, status, list(warnings)
+
+    def _compute_health_status(self) -> Tuple[str, str, List[str]]:
         warnings = []
         danger = 0
 
@@ -595,48 +885,44 @@ class SettingsManager:
         return "🟢", "HEALTHY", []
 
     def get_summary(self, balance: float = 10000.0) -> str:
-        lines = []
-        lines.append("=" * 60)
-        lines.append("              CURRENT CONFIGURATION".center(60))
-        lines.append("=" * 60)
+        # Ambil tiap section sekali (bukan lewat get_* satu per satu); health dari memo
+        cfg = self._settings_cache
+        tr = cfg.get(KEY_TRADING, {})
+        rm = cfg.get(KEY_RISK, {})
+        sig = cfg.get(KEY_SIGNALS, {})
+        flt = cfg.get(KEY_FILTERS, {})
+        active_preset = cfg.get('active_preset')
 
         emoji, status, warns = self.get_health_status()
-        lines.append(f" {emoji} Health: {status}")
-        if self._settings_cache.get('active_preset'):
-            lines.append(f" 💾 Preset: {self._settings_cache['active_preset']}")
-        lines.append("")
-
-        lines.append(" 📊 TRADING:")
-        lines.append(f" Symbol:        {self.get_symbol()}")
-        lines.append(f" Timeframe:     {self.get_timeframe()}")
-        lines.append(f" Mode:          {self.get_trading_mode()}")
-        lines.append(f" Style:         {self.get_trading_style()}")
-        lines.append("")
-
-        lines.append(" 💰 RISK:")
-        risk_pct = self.get_risk_per_trade()
-        risk_usd = balance * (risk_pct / 100.0)
-        lines.append(f" Per Trade:     {risk_pct}% (~${risk_usd:.2f})")
-
-        max_risk = self.get_max_total_risk()
-        max_usd = balance * (max_risk / 100.0)
-        lines.append(f" Max Total:     {max_risk}% (~${max_usd:.2f})")
-        lines.append("")
-
-        lines.append(" 🛡️ FILTERS:")
-        lines.append(f" News Filter:   {'ON' if self.get_news_filter_enabled() else 'OFF'}")
-        lines.append(f" MTF Filter:    {'ON' if self._get(KEY_SIGNALS, 'enable_mtf') else 'OFF'}")
-
-        if warns:
-            lines.append("")
-            lines.append(" ⚠️ WARNINGS:")
-            for w in warns:
-                lines.append(f" {w}")
-
-        lines.append("=" * 60)
-        return "\n".join(lines)
+        risk_pct = float(rm.get('risk_per_trade_pct', 1.0))
+        max_risk = float(rm.get('max_total_risk_pct', 5.0))
+
+        return _SUMMARY_TEMPLATE.format_map({
+            'emoji': emoji,
+            'status': status,
+            'preset': f"\n 💾 Preset: {active_preset}" if active_preset else "",
+            'symbol': tr.get('symbol', 'XAUUSD'),
+            'timeframe': tr.get('timeframe', 'M5'),
+            'mode': sig.get('strategy_mode_override', 'AUTO'),
+            'style': tr.get('trading_style', 'SCALPING'),
+            'risk_pct': risk_pct,
+            'risk_usd': balance * (risk_pct / 100.0),
+            'max_risk': max_risk,
+            'max_usd': balance * (max_risk / 100.0),
+            'news': 'ON' if flt.get('news_filter_enabled', True) else 'OFF',
+            'mtf': 'ON' if sig.get('enable_mtf') else 'OFF',
+            'warnings': "\n\n ⚠️ WARNINGS:\n" + "\n".join(f" {w}" for w in warns) if warns else "",
+        })
 
     def get_quick_stats(self, balance: float = 10000.0) -> Dict[str, Any]:
+        memo = self._quick_stats_memo
+        if memo is None or memo[0] != self._cache_gen or memo[1] != balance:
+            memo = self._quick_stats_memo = (self._cache_gen, balance, self._compute_quick_stats(balance))
+        stats = dict(memo[2])
+        stats['warnings'] = list(stats['warnings'])
+        return stats
+
+    def _compute_quick_stats(self, balance: float) -> Dict[str, Any]:
         risk_pct = self.get_risk_per_trade()
         max_risk = self.get_max_total_risk()
         max_pos = self.get_max_positions()